@@ -1,10 +1,11 @@
 # jwt_bearer.py
 from fastapi import Request, HTTPException, Depends
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from .jwt_handler import verify_token, REFRESH_SECRET_KEY, SECRET_KEY
 from ..database.session import get_db
 from ..crud.user import get_user_by_email, get_refresh_token
+from .principal_cache import principal_cache
 import logging
 
 logger = logging.getLogger(__name__)
@@ -16,7 +17,7 @@ class JWTBearer(HTTPBearer):
         self.secret_key = REFRESH_SECRET_KEY if refresh_token else SECRET_KEY
         logger.debug(f"JWTBearer initialized with {'refresh' if refresh_token else 'access'} token mode")
 
-    async def __call__(self, request: Request, db: Session = Depends(get_db)):
+    async def __call__(self, request: Request, db: AsyncSession = Depends(get_db)):
         credentials: HTTPAuthorizationCredentials = await super(JWTBearer, self).__call__(request)
         
         logger.debug(f"Verifying {'refresh' if self.refresh_token else 'access'} token")
@@ -50,6 +51,15 @@ class JWTBearer(HTTPBearer):
                     headers={"WWW-Authenticate": "Bearer"},
                 )
             
+            # Resolve the user, preferring the principal cache over Postgres
+            user = await self._get_user(db, payload)
+            if user is None:
+                raise HTTPException(
+                    status_code=404,
+                    detail="User not found",
+                    headers={"WWW-Authenticate": "Bearer"},
+                )
+
             # For refresh tokens, verify it hasn't been revoked
             if self.refresh_token:
                 jti = payload.get("jti")
@@ -60,15 +70,7 @@ class JWTBearer(HTTPBearer):
                         headers={"WWW-Authenticate": "Bearer"},
                     )
                 
-                
-                user = get_user_by_email(db, email)
-                if not user:
-                    raise HTTPException(
-                        status_code=404,
-                        detail="User not found",
-                        headers={"WWW-Authenticate": "Bearer"},
-                    )
-                stored_token = get_refresh_token(db, jti, user.id)
+                stored_token = await get_refresh_token(db, jti, user.id)
                 if not stored_token:
                     raise HTTPException(
                         status_code=403, 
@@ -81,15 +83,6 @@ class JWTBearer(HTTPBearer):
                         detail="Refresh token has been revoked",
                         headers={"WWW-Authenticate": "Bearer"},
                     )
-            
-            # Get user from database
-            user = get_user_by_email(db, email)
-            if user is None:
-                raise HTTPException(
-                    status_code=404, 
-                    detail="User not found",
-                    headers={"WWW-Authenticate": "Bearer"},
-                )
                 
             return user
             
@@ -98,4 +91,21 @@ class JWTBearer(HTTPBearer):
                 status_code=403, 
                 detail=str(e),
                 headers={"WWW-Authenticate": "Bearer"},
-            )
\ No newline at end of file
+            )
+
+    @staticmethod
+    async def _get_user(db: AsyncSession, payload: dict):
+        user = principal_cache.get(payload)
+        if user is None:
+            user = await get_user_by_email(db, payload["sub"])
+            if user is None:
+                return None
+            # Keep a detached copy so later commits in this session don't expire it
+            db.expunge(user)
+            principal_cache.set(payload, user)
+            logger.debug(f"Principal cache miss for {payload['sub']} - stats: {principal_cache.stats()}")
+        else:
+            logger.debug(f"Principal cache hit for {payload['sub']}")
+
+        # Attach a per-request copy without re-querying the row
+        return await db.merge(user, load=False)
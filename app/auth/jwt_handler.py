@@ -1,6 +1,8 @@
 # jwt_handler.py
-from datetime import datetime, timedelta
-from typing import Optional, Tuple
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from typing import NamedTuple, Optional
 from jose import JWTError, jwt
 from passlib.context import CryptContext
 from dotenv import load_dotenv
@@ -16,6 +18,8 @@ REFRESH_SECRET_KEY = os.getenv("REFRESH_SECRET_KEY", os.getenv("SECRET_KEY"))  #
 ALGORITHM = os.getenv("ALGORITHM", "HS256")  # Add default value of HS256
 ACCESS_TOKEN_EXPIRE_MINUTES = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", "30"))  # 30 minutes default
 REFRESH_TOKEN_EXPIRE_DAYS = int(os.getenv("REFRESH_TOKEN_EXPIRE_DAYS", "7"))  # 7 days default
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", "2"))  # Threads dedicated to bcrypt
+PASSWORD_HASH_MAX_PENDING = int(os.getenv("PASSWORD_HASH_MAX_PENDING", "32"))  # Queued + running jobs before rejecting
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     return pwd_context.verify(plain_password, hashed_password)
@@ -23,6 +27,49 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
 def get_password_hash(password: str) -> str:
     return pwd_context.hash(password)
 
+
+class PasswordHasherBusy(Exception):
+    """Raised when the password hashing pool is saturated"""
+
+
+class PasswordHashPool:
+    """
+    Runs bcrypt work on a dedicated, size-limited thread pool so a login storm
+    cannot freeze the event loop. bcrypt releases the GIL while hashing, so
+    threads give real parallelism here. Once `max_pending` jobs are queued or
+    running, new jobs are rejected instead of piling up behind the pool.
+    """
+
+    def __init__(self, max_workers: int, max_pending: int):
+        self.max_pending = max_pending
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="password-hash")
+        self._pending = 0
+
+    async def run(self, func, *args):
+        # Only touched from the event loop thread, so no lock is needed
+        if self._pending >= self.max_pending:
+            logger.warning(f"Password hashing pool saturated ({self._pending} pending jobs)")
+            raise PasswordHasherBusy("Too many concurrent password operations")
+
+        self._pending += 1
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._executor, func, *args)
+        finally:
+            self._pending -= 1
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+password_pool = PasswordHashPool(PASSWORD_HASH_WORKERS, PASSWORD_HASH_MAX_PENDING)
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    return await password_pool.run(verify_password, plain_password, hashed_password)
+
+async def get_password_hash_async(password: str) -> str:
+    return await password_pool.run(get_password_hash, password)
+
 def create_token(data: dict, expires_delta: timedelta, secret_key: str = SECRET_KEY) -> str:
     to_encode = data.copy()
     expire = datetime.utcnow() + expires_delta
@@ -31,7 +78,13 @@ def create_token(data: dict, expires_delta: timedelta, secret_key: str = SECRET_
     encoded_jwt = jwt.encode(to_encode, secret_key, algorithm=ALGORITHM)
     return encoded_jwt
 
-def create_tokens(email: str) -> Tuple[str, str]:
+class TokenPair(NamedTuple):
+    access_token: str
+    refresh_token: str
+    refresh_token_id: str  # JTI of the refresh token
+    refresh_expires_at: datetime
+
+def create_tokens(email: str) -> TokenPair:
     # Create access token
     access_token_expires = timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
     access_token = create_token(
@@ -41,17 +94,20 @@ def create_tokens(email: str) -> Tuple[str, str]:
     
     # Create refresh token
     refresh_token_expires = timedelta(days=REFRESH_TOKEN_EXPIRE_DAYS)
+    refresh_token_id = token_urlsafe(32)  # Add unique identifier for the refresh token
     refresh_token = create_token(
         data={
             "sub": email,
             "type": "refresh",
-            "jti": token_urlsafe(32)  # Add unique identifier for the refresh token
+            "jti": refresh_token_id
         },
         expires_delta=refresh_token_expires,
         secret_key=REFRESH_SECRET_KEY
     )
     
-    return access_token, refresh_token
+    # Returned alongside the token so callers can store it without re-decoding
+    refresh_expires_at = datetime.now(timezone.utc) + refresh_token_expires
+    return TokenPair(access_token, refresh_token, refresh_token_id, refresh_expires_at)
 
 def verify_token(token: str, credentials_exception, secret_key: str = SECRET_KEY) -> dict:
     try:
@@ -0,0 +1,59 @@
+# principal_cache.py
+import time
+from typing import Optional
+
+from ..config import get_settings
+from ..models.models import UserModel
+from ..utils.cache import TTLCache
+from loguru import logger
+
+settings = get_settings()
+
+
+class PrincipalCache:
+    """
+    Caches the authenticated user behind a verified token so JWTBearer does not
+    query Postgres on every request.
+
+    Entries are keyed by the token subject plus its `jti` (refresh tokens) or
+    `exp` (access tokens), and never outlive the token itself. Cached users are
+    detached instances: callers must `merge(..., load=False)` them into their
+    own session before use.
+    """
+
+    def __init__(self, maxsize: int, ttl: int):
+        self._cache = TTLCache(maxsize=maxsize, ttl=ttl)
+
+    @staticmethod
+    def _key(payload: dict) -> tuple:
+        return (payload["sub"], payload.get("jti") or payload.get("exp"))
+
+    def get(self, payload: dict) -> Optional[UserModel]:
+        return self._cache.get(self._key(payload))
+
+    def set(self, payload: dict, user: UserModel) -> None:
+        ttl = self._cache.ttl
+        exp = payload.get("exp")
+        if exp is not None:
+            ttl = min(ttl, exp - time.time())
+        if ttl <= 0:
+            return
+        self._cache.set(self._key(payload), user, ttl=ttl)
+
+    def invalidate(self, email: str) -> int:
+        """Drop every cached principal for the user, e.g. after a profile change"""
+        removed = self._cache.discard_where(lambda key: key[0] == email)
+        logger.debug(f"Invalidated {removed} cached principal(s) for {email}")
+        return removed
+
+    def clear(self) -> None:
+        self._cache.clear()
+
+    def stats(self) -> dict:
+        return self._cache.stats()
+
+
+principal_cache = PrincipalCache(
+    maxsize=settings.PRINCIPAL_CACHE_MAXSIZE,
+    ttl=settings.PRINCIPAL_CACHE_TTL_SECONDS
+)
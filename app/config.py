@@ -17,12 +17,52 @@ class Settings:
     
     # Construct Database URL
     DATABASE_URL = f'postgresql://{POSTGRES_USER}:{POSTGRES_PASSWORD}@{DATABASE_HOST}:5432/{POSTGRES_DB}'
+    ASYNC_DATABASE_URL = f'postgresql+asyncpg://{POSTGRES_USER}:{POSTGRES_PASSWORD}@{DATABASE_HOST}:5432/{POSTGRES_DB}'
+    DATABASE_POOL_SIZE = int(os.getenv('DATABASE_POOL_SIZE', '10'))
+    DATABASE_MAX_OVERFLOW = int(os.getenv('DATABASE_MAX_OVERFLOW', '20'))
     
     # MongoDB settings
     MONGODB_HOST = 'mongodb' if IS_DOCKER else 'localhost'
     MONGODB_URL = f'mongodb://{MONGODB_HOST}:27017/'
     MONGODB_DB_NAME = os.getenv('MONGODB_DB_NAME', 'ai_chat')
 
+    # Authenticated-principal cache (see app/auth/principal_cache.py)
+    PRINCIPAL_CACHE_MAXSIZE = int(os.getenv('PRINCIPAL_CACHE_MAXSIZE', '10000'))
+    PRINCIPAL_CACHE_TTL_SECONDS = int(os.getenv('PRINCIPAL_CACHE_TTL_SECONDS', '300'))
+
+    # Tag name -> id cache used when resolving item tags (see app/crud/wardrobe.py)
+    TAG_CACHE_MAXSIZE = int(os.getenv('TAG_CACHE_MAXSIZE', '5000'))
+    TAG_CACHE_TTL_SECONDS = int(os.getenv('TAG_CACHE_TTL_SECONDS', '3600'))
+
+    # Read-through cache of wardrobe listing responses (see app/utils/response_cache.py).
+    # Setting LISTING_CACHE_REDIS_URL swaps the in-process LRU for a shared
+    # Redis-compatible server (requires the `redis` package).
+    LISTING_CACHE_MAXSIZE = int(os.getenv('LISTING_CACHE_MAXSIZE', '10000'))
+    LISTING_CACHE_TTL_SECONDS = int(os.getenv('LISTING_CACHE_TTL_SECONDS', '60'))
+    LISTING_CACHE_REDIS_URL = os.getenv('LISTING_CACHE_REDIS_URL')
+
+    # Chat history sent to the model per turn (see ChatCRUD.get_history_window)
+    CHAT_HISTORY_WINDOW_MESSAGES = int(os.getenv('CHAT_HISTORY_WINDOW_MESSAGES', '30'))
+    CHAT_HISTORY_TOKEN_BUDGET = int(os.getenv('CHAT_HISTORY_TOKEN_BUDGET', '4000'))
+    # Messages per chat_message_buckets document; do not change once messages are stored
+    CHAT_MESSAGE_BUCKET_SIZE = int(os.getenv('CHAT_MESSAGE_BUCKET_SIZE', '100'))
+    # How long a missing seq is treated as an append still in flight (see settled_messages)
+    CHAT_MESSAGE_GAP_GRACE_SECONDS = int(os.getenv('CHAT_MESSAGE_GAP_GRACE_SECONDS', '30'))
+
+    # Bulk wardrobe import (POST /api/wardrobe/items/import)
+    IMPORT_BATCH_SIZE = int(os.getenv('IMPORT_BATCH_SIZE', '500'))
+    IMPORT_MAX_REPORTED_ERRORS = int(os.getenv('IMPORT_MAX_REPORTED_ERRORS', '100'))
+    IMPORT_MAX_LINE_BYTES = int(os.getenv('IMPORT_MAX_LINE_BYTES', '65536'))
+
+    # Archival of soft-deleted items (see app/tasks/item_archive.py)
+    ITEM_ARCHIVE_RETENTION_DAYS = int(os.getenv('ITEM_ARCHIVE_RETENTION_DAYS', '30'))
+    ITEM_ARCHIVE_INTERVAL_SECONDS = int(os.getenv('ITEM_ARCHIVE_INTERVAL_SECONDS', '3600'))
+    ITEM_ARCHIVE_BATCH_SIZE = int(os.getenv('ITEM_ARCHIVE_BATCH_SIZE', '500'))
+
+    # Background sweeper for expired refresh tokens (see app/tasks/refresh_tokens.py)
+    REFRESH_TOKEN_SWEEP_INTERVAL_SECONDS = int(os.getenv('REFRESH_TOKEN_SWEEP_INTERVAL_SECONDS', '3600'))
+    REFRESH_TOKEN_SWEEP_BATCH_SIZE = int(os.getenv('REFRESH_TOKEN_SWEEP_BATCH_SIZE', '1000'))
+
 @lru_cache
 def get_settings():
     return Settings()
\ No newline at end of file
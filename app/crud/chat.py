@@ -1,19 +1,67 @@
 
-from typing import List, Optional, Dict
-from datetime import datetime
+import asyncio
+from typing import List, Optional, Dict, Tuple
+from datetime import datetime, timedelta
 from bson import ObjectId
+from bson.errors import InvalidId
+from pymongo import ASCENDING, DESCENDING, ReturnDocument
 from uuid import UUID
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
+from ..config import get_settings
 from ..database.mongodb import MongoDB
-from ..models.chat import ChatSession, Message
+from ..models.chat import ChatHistoryWindow, ChatSession, ChatSessionPage, ChatSessionSummary, Message
 from ..schemas.chat import ChatContextOptions
-from ..crud.wardrobe import get_user_items, get_item
-from ..crud.user import get_user_by_id
+from ..crud.wardrobe import get_user_items, get_items_by_ids
+from ..crud.user import load_user_profile
+from ..utils.openai_helper import openai_helper
+from ..utils.pagination import encode_cursor, decode_cursor
+
+settings = get_settings()
+
+# Messages are stored in chat_message_buckets, CHAT_MESSAGE_BUCKET_SIZE to a
+# document, rather than in one ever-growing array on the session:
+#   {session_id, user_id, bucket, count, messages: [{seq, role, content, timestamp}]}
+# The session document only keeps message_count, last_seq (the last sequence
+# number handed out) and a last_message preview.
+PREVIEW_LENGTH = 200
+
+def message_bucket(seq: int) -> int:
+    """Bucket number holding the message with sequence number `seq` (from 1)"""
+    return (seq - 1) // settings.CHAT_MESSAGE_BUCKET_SIZE
+
+def message_preview(message: Dict) -> Dict:
+    """The last_message summary kept on the session document"""
+    return {
+        "role": message['role'],
+        "content": message['content'][:PREVIEW_LENGTH],
+        "timestamp": message['timestamp']
+    }
+
+def settled_messages(messages: List[Dict], after: Optional[int] = None) -> Tuple[List[Dict], bool]:
+    """
+    Cut `messages` (sorted by seq) at the first sequence number still being
+    appended, returning the messages before it and whether any were cut.
+
+    add_message takes a seq from the session before pushing the message to
+    its bucket, so seq N+1 can be readable before seq N is. A client that
+    synced up to N+1 would then ask for what comes after it and never see N.
+    A missing seq (counting from `after` + 1 when given) therefore ends what
+    is returned, unless the message following it is older than
+    CHAT_MESSAGE_GAP_GRACE_SECONDS: then the append that took it has failed
+    and the gap is permanent.
+    """
+    cutoff = datetime.utcnow() - timedelta(seconds=settings.CHAT_MESSAGE_GAP_GRACE_SECONDS)
+    expected = after + 1 if after is not None else None
+    for index, msg in enumerate(messages):
+        if expected is not None and msg['seq'] != expected and msg['timestamp'] > cutoff:
+            return messages[:index], True
+        expected = msg['seq'] + 1
+    return messages, False
 
 class ChatCRUD:
     @staticmethod
-    def get_user_context(
-        db: Session, 
+    async def get_user_context(
+        db: AsyncSession, 
         user_id: UUID, 
         context_options: ChatContextOptions
     ) -> Dict:
@@ -23,15 +71,11 @@ class ChatCRUD:
         # Get wardrobe items if requested
         if context_options.include_wardrobe:
             if context_options.specific_items and len(context_options.specific_items) > 0:
-                # Get only specific wardrobe items
-                wardrobe_items = []
-                for item_id in context_options.specific_items:
-                    item = get_item(db, item_id)
-                    if item:
-                        wardrobe_items.append(item)
+                # Get only specific wardrobe items, scoped to the user
+                wardrobe_items = await get_items_by_ids(db, user_id, context_options.specific_items)
             else:
                 # Get all wardrobe items
-                wardrobe_items = get_user_items(db, user_id)
+                wardrobe_items = await get_user_items(db, user_id)
             
             if wardrobe_items:
                 context["wardrobe_items"] = [
@@ -54,7 +98,7 @@ class ChatCRUD:
             context_options.include_style_preferences,
             context_options.include_shopping_habits
         ]):
-            user_data = get_user_by_id(db, user_id)
+            user_data = await load_user_profile(db, user_id, include_preferences=False)
             if user_data and user_data.user_details:
                 user_details = {}
                 
@@ -69,9 +113,9 @@ class ChatCRUD:
                 if context_options.include_style_preferences and user_data.user_details.style_preferences:
                     style_prefs = user_data.user_details.style_preferences
                     user_details["style_preferences"] = {
-                        "favorite_colors": style_prefs.favorite_colors,
-                        "preferred_brands": style_prefs.preferred_brands,
-                        "lifestyle_choices": style_prefs.lifestyle_choices,
+                        "favorite_colors": list(style_prefs.favorite_colors),
+                        "preferred_brands": list(style_prefs.preferred_brands),
+                        "lifestyle_choices": list(style_prefs.lifestyle_choices),
                         "budget": {
                             "min_amount": style_prefs.budget.min_amount,
                             "max_amount": style_prefs.budget.max_amount
@@ -82,7 +126,7 @@ class ChatCRUD:
                     shopping = user_data.user_details.style_preferences.shopping_habits
                     user_details["shopping_habits"] = {
                         "frequency": shopping.frequency,
-                        "preferred_retailers": shopping.preferred_retailers
+                        "preferred_retailers": list(shopping.preferred_retailers)
                     }
                 
                 if user_details:
@@ -92,15 +136,15 @@ class ChatCRUD:
 
     @staticmethod
     async def create_chat_session(
-        db: Session, 
+        db: AsyncSession, 
         user_id: UUID, 
         context_options: ChatContextOptions,
         session_name: Optional[str] = None
     ) -> str:
         mongodb = MongoDB.get_db()
         
-        # Get user selected context (synchronous call)
-        user_context = ChatCRUD.get_user_context(db, user_id, context_options)
+        # Get user selected context
+        user_context = await ChatCRUD.get_user_context(db, user_id, context_options)
         
         # Create appropriate system message based on available context
         system_content = ["You are a personal fashion stylist assistant."]
@@ -154,55 +198,91 @@ class ChatCRUD:
         
         system_message = Message(
             role="system",
-            content="\n".join(system_content)
+            content="\n".join(system_content),
+            seq=1
         )
         
         chat_session = ChatSession(
             user_id=user_id,
-            messages=[system_message],
             session_name=session_name,
             user_context=user_context
         )
         
-        session_dict = chat_session.model_dump()
+        session_dict = chat_session.model_dump(exclude={"id", "messages", "message_count", "last_message"})
         session_dict['user_id'] = str(session_dict['user_id'])
+        session_dict.update(
+            message_count=1,
+            last_seq=system_message.seq,
+            last_message=message_preview(system_message.model_dump())
+        )
         
         result = await mongodb.chat_sessions.insert_one(session_dict)
+        await mongodb.chat_message_buckets.insert_one({
+            "session_id": result.inserted_id,
+            "user_id": session_dict['user_id'],
+            "bucket": message_bucket(system_message.seq),
+            "count": 1,
+            "messages": [system_message.model_dump()]
+        })
         return str(result.inserted_id)
 
     @staticmethod
     async def add_message(session_id: str, role: str, content: str) -> bool:
+        """
+        Append a message to the session's current bucket.
+
+        The session's `last_seq` counter hands out the message's sequence
+        number, which picks its bucket, so only the small session document
+        and one bounded bucket are written.
+        """
         mongodb = MongoDB.get_db()
         message = Message(role=role, content=content)
-        result = await mongodb.chat_sessions.update_one(
+        session = await mongodb.chat_sessions.find_one_and_update(
             {"_id": ObjectId(session_id)},
+            {
+                "$inc": {"last_seq": 1, "message_count": 1},
+                "$set": {"updated_at": message.timestamp, "last_message": message_preview(message.model_dump())}
+            },
+            projection={"user_id": 1, "last_seq": 1},
+            return_document=ReturnDocument.AFTER
+        )
+        if not session:
+            return False
+
+        message.seq = session['last_seq']
+        await mongodb.chat_message_buckets.update_one(
+            {"session_id": session['_id'], "bucket": message_bucket(message.seq)},
             {
                 "$push": {"messages": message.model_dump()},
-                "$set": {"updated_at": datetime.utcnow()}
-            }
+                "$inc": {"count": 1},
+                "$setOnInsert": {"user_id": session['user_id']}
+            },
+            upsert=True
         )
-        return result.modified_count > 0
+        return True
       
       
     @staticmethod
     async def get_chat_history(session_id: str) -> Optional[ChatSession]:
-        """Get chat session by ID"""
+        """Get chat session by ID, with every message"""
         mongodb = MongoDB.get_db()
         
         try:
             chat = await mongodb.chat_sessions.find_one({"_id": ObjectId(session_id)})
             if chat:
+                buckets = mongodb.chat_message_buckets.find(
+                    {"session_id": chat['_id']},
+                    {"messages": 1}
+                ).sort("bucket", 1)
+                messages = [msg async for bucket in buckets for msg in bucket['messages']]
 
                 # Convert ObjectId to string and set as id
                 chat['id'] = str(chat['_id'])
                 del chat['_id']  # Remove the _id field since we've converted it
 
-                
-                # Convert stored messages to Message objects
-                if 'messages' in chat:
-                    chat['messages'] = [
-                        Message(**msg) for msg in chat['messages']
-                    ]
+                # Concurrent appends to one bucket may land out of order
+                messages, _ = settled_messages(sorted(messages, key=lambda msg: msg['seq']))
+                chat['messages'] = [Message(**msg) for msg in messages]
                 
                 return ChatSession(**chat)
             return None
@@ -211,39 +291,188 @@ class ChatCRUD:
             return None
 
     @staticmethod
-    async def get_user_chat_sessions(user_id: UUID) -> List[ChatSession]:
-        """Get all chat sessions for a user"""
+    async def get_message_page(
+        session_id: str,
+        since: Optional[int] = None,
+        before: Optional[int] = None,
+        limit: int = 50
+    ) -> Optional[ChatSessionPage]:
+        """
+        Get a session with up to `limit` of its messages, by sequence number:
+
+        - `since`: the first messages after it (what a client holding
+          everything up to `since` is missing)
+        - `before`: the last messages before it (scrolling back)
+        - neither: the newest messages
+
+        Only the buckets covering that range are read, so the cost follows
+        `limit`, not the length of the conversation. Messages after a seq
+        that is still being appended are left out (see `settled_messages`),
+        so the highest seq returned is always safe to pass as `since`.
+        """
         mongodb = MongoDB.get_db()
-        
+        # Enough buckets for limit + 1 messages even when the first is nearly empty
+        bucket_count = limit // settings.CHAT_MESSAGE_BUCKET_SIZE + 2
+
         try:
-            cursor = mongodb.chat_sessions.find({"user_id": str(user_id)})
-            sessions = []
-            
-            async for chat in cursor:
+            session_oid = ObjectId(session_id)
+        except InvalidId:
+            return None
+        bucket_query = {"session_id": session_oid}
+        if since is not None:
+            bucket_query["bucket"] = {"$gte": message_bucket(since + 1)}
+            direction = ASCENDING
+        else:
+            if before is not None:
+                bucket_query["bucket"] = {"$lte": message_bucket(before - 1)}
+            direction = DESCENDING
 
-                # Convert ObjectId to string and set as id
-                chat['id'] = str(chat['_id'])
-                del chat['_id']  # Remove the _id field since we've converted it
-  
-                # Convert stored messages to Message objects
-                if 'messages' in chat:
-                    chat['messages'] = [
-                        Message(**msg) for msg in chat['messages']
-                    ]
-                
-                sessions.append(ChatSession(**chat))
-            
-            return sessions
+        chat, buckets = await asyncio.gather(
+            mongodb.chat_sessions.find_one({"_id": session_oid}),
+            mongodb.chat_message_buckets.find(
+                bucket_query,
+                {"messages": 1}
+            ).sort("bucket", direction).limit(bucket_count).to_list(length=None)
+        )
+        if not chat:
+            return None
+
+        messages = sorted(
+            (
+                msg for bucket in buckets for msg in bucket['messages']
+                if (since is None or msg['seq'] > since) and (before is None or msg['seq'] < before)
+            ),
+            key=lambda msg: msg['seq']
+        )
+        # Buckets left unread (the limit was hit) may hold more of the range
+        has_more = len(messages) > limit or len(buckets) == bucket_count
+        if since is not None:
+            messages, cut = settled_messages(messages[:limit], after=since)
+            has_more = has_more or cut
+        else:
+            # Newer messages than a cut are picked up by the next `since` read
+            messages, _ = settled_messages(messages[-limit:])
+
+        chat['id'] = str(chat.pop('_id'))
+        chat['messages'] = [Message(**msg) for msg in messages]
+        return ChatSessionPage(**chat, has_more=has_more)
+
+    @staticmethod
+    async def get_history_window(
+        session_id: str,
+        max_messages: int = settings.CHAT_HISTORY_WINDOW_MESSAGES,
+        token_budget: Optional[int] = settings.CHAT_HISTORY_TOKEN_BUDGET
+    ) -> Optional[ChatHistoryWindow]:
+        """
+        Get a session's owner and context plus its recent non-system messages:
+        at most the last `max_messages`, cut down to the newest ones whose
+        content fits in `token_budget` tokens (None for no budget).
+
+        The session is read without its counters and previews, and only the
+        newest buckets that can hold `max_messages` are read, both at once, so
+        the cost does not grow with the conversation.
+        """
+        mongodb = MongoDB.get_db()
+        # The newest bucket may hold a single message
+        bucket_count = -(-max_messages // settings.CHAT_MESSAGE_BUCKET_SIZE) + 1
+
+        try:
+            session_oid = ObjectId(session_id)
+            chat, buckets = await asyncio.gather(
+                mongodb.chat_sessions.find_one(
+                    {"_id": session_oid},
+                    {"user_id": 1, "user_context": 1}
+                ),
+                mongodb.chat_message_buckets.find(
+                    {"session_id": session_oid},
+                    {"messages": 1}
+                ).sort("bucket", -1).limit(bucket_count).to_list(length=None)
+            )
         except Exception as e:
-            print(f"Error retrieving user chat sessions: {e}")
-            return []
+            print(f"Error retrieving chat history window: {e}")
+            return None
+        if not chat:
+            return None
+
+        messages = sorted(
+            (msg for bucket in buckets for msg in bucket['messages']),
+            key=lambda msg: msg['seq']
+        )[-max_messages:]
+
+        # Walk back from the newest message until the budget runs out
+        window = []
+        tokens = 0
+        for msg in reversed(messages):
+            if msg['role'] == "system":
+                continue  # The system prompt is rebuilt from user_context
+            if token_budget is not None:
+                tokens += openai_helper.count_tokens(msg['content'])
+                if tokens > token_budget:
+                    break
+            window.append(msg)
+
+        return ChatHistoryWindow(
+            id=str(chat['_id']),
+            user_id=chat['user_id'],
+            user_context=chat.get('user_context'),
+            messages=[Message(**msg) for msg in reversed(window)]
+        )
+
+    @staticmethod
+    async def get_user_chat_session_page(
+        user_id: UUID,
+        limit: int = 20,
+        cursor: Optional[str] = None
+    ) -> Tuple[List[ChatSessionSummary], Optional[str]]:
+        """
+        Keyset-paginate the user's sessions on (updated_at, _id), most
+        recently active first, without their messages.
+
+        Only the summary fields are projected, and the (user_id, updated_at,
+        _id) index serves both the filter and the sort.
+
+        Raises:
+            ValueError: If the cursor is malformed
+        """
+        mongodb = MongoDB.get_db()
+        query = {"user_id": str(user_id)}
+        if cursor:
+            updated_at, session_id = decode_cursor(cursor, size=2)
+            try:
+                updated_at, session_oid = datetime.fromisoformat(updated_at), ObjectId(session_id)
+            except (TypeError, ValueError, InvalidId):
+                raise ValueError("Invalid cursor")
+            query["$or"] = [
+                {"updated_at": {"$lt": updated_at}},
+                {"updated_at": updated_at, "_id": {"$lt": session_oid}}
+            ]
+
+        chats = await mongodb.chat_sessions.find(
+            query,
+            {"session_name": 1, "created_at": 1, "updated_at": 1, "message_count": 1, "last_message": 1}
+        ).sort(
+            [("updated_at", DESCENDING), ("_id", DESCENDING)]
+        ).limit(limit + 1).to_list(length=None)  # One extra tells us whether there is a next page
+
+        next_cursor = None
+        if len(chats) > limit:
+            chats = chats[:limit]
+            next_cursor = encode_cursor(chats[-1]['updated_at'], str(chats[-1]['_id']))
+
+        sessions = []
+        for chat in chats:
+            chat['id'] = str(chat.pop('_id'))
+            sessions.append(ChatSessionSummary(**chat))
+        return sessions, next_cursor
 
     @staticmethod
     async def delete_chat_session(session_id: str) -> bool:
-        """Delete a chat session"""
+        """Delete a chat session and its messages"""
         mongodb = MongoDB.get_db()
         try:
-            result = await mongodb.chat_sessions.delete_one({"_id": ObjectId(session_id)})
+            session_oid = ObjectId(session_id)
+            await mongodb.chat_message_buckets.delete_many({"session_id": session_oid})
+            result = await mongodb.chat_sessions.delete_one({"_id": session_oid})
             return result.deleted_count > 0
         except Exception as e:
             print(f"Error deleting chat session: {e}")
@@ -251,14 +480,20 @@ class ChatCRUD:
 
     @staticmethod
     async def clear_chat_history(session_id: str) -> bool:
-        """Clear messages from a chat session but keep the session"""
+        """
+        Clear messages from a chat session but keep the session. Sequence
+        numbers keep counting up from where they were.
+        """
         mongodb = MongoDB.get_db()
         try:
+            session_oid = ObjectId(session_id)
+            await mongodb.chat_message_buckets.delete_many({"session_id": session_oid})
             result = await mongodb.chat_sessions.update_one(
-                {"_id": ObjectId(session_id)},
+                {"_id": session_oid},
                 {
                     "$set": {
-                        "messages": [],
+                        "message_count": 0,
+                        "last_message": None,
                         "updated_at": datetime.utcnow()
                     }
                 }
@@ -274,8 +509,9 @@ class ChatCRUD:
         """Delete all chat sessions for a user"""
         mongodb = MongoDB.get_db()
         try:
+            await mongodb.chat_message_buckets.delete_many({"user_id": str(user_id)})
             result = await mongodb.chat_sessions.delete_many({"user_id": str(user_id)})
             return result.deleted_count > 0
         except Exception as e:
             print(f"Error deleting all chat sessions: {e}")
-            return False
\ No newline at end of file
+            return False
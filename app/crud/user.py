@@ -1,148 +1,264 @@
-from sqlalchemy.orm import Session
+from sqlalchemy import select, update, delete, insert, literal, String, DateTime, Boolean
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import joinedload
 from ..models.models import UserModel, UserDetailsModel, BodyMeasurementsModel, StylePreferencesModel, BudgetModel, ShoppingHabitsModel, UserPreferencesModel
 from ..schemas.schemas import UserCreateSchema, UserUpdateSchema
-from ..auth.jwt_handler import ALGORITHM, REFRESH_SECRET_KEY, get_password_hash
-from jose import jwt
-from datetime import datetime
+from datetime import datetime, timezone
+from typing import Optional
+from uuid import UUID
 from ..models.refresh_token import RefreshToken
+from ..models.user_profile import UserProfileSnapshot
 from loguru import logger
 
-def create_refresh_token(db: Session, user_id: int, token: str):
-    # Decode token to get JTI and expiration
-    payload = jwt.decode(token, REFRESH_SECRET_KEY, algorithms=[ALGORITHM])
-    jti = payload["jti"]
-    exp = datetime.fromtimestamp(payload["exp"])
-    
+def _user_details_options():
+    """
+    Eager loads for the user_details -> measurements/style preferences graph.
+    Every hop is one-to-one, so they are joined into the user query itself.
+    """
+    return [
+        joinedload(UserModel.user_details).joinedload(UserDetailsModel.body_measurements),
+        joinedload(UserModel.user_details).joinedload(UserDetailsModel.style_preferences).joinedload(StylePreferencesModel.budget),
+        joinedload(UserModel.user_details).joinedload(UserDetailsModel.style_preferences).joinedload(StylePreferencesModel.shopping_habits),
+    ]
+
+async def create_refresh_token(db: AsyncSession, user_id: int, token_id: str, expires_at: datetime):
     refresh_token = RefreshToken(
         user_id=user_id,
-        token_id=jti,
-        expires_at=exp
+        token_id=token_id,
+        expires_at=expires_at
     )
     db.add(refresh_token)
-    db.commit()
+    await db.commit()
     return refresh_token
 
-def get_refresh_token(db: Session, token_id: str, user_id: int):
+async def rotate_refresh_token(
+    db: AsyncSession,
+    token_id: str,
+    new_token_id: str,
+    new_expires_at: datetime
+) -> Optional[UUID]:
+    """
+    Revoke the user's active refresh tokens and store the new one in a single
+    statement.
+
+    Returns the owning user's id, or None if `token_id` is unknown, revoked or
+    expired. A concurrent rotation of the same token waits on the row locks of
+    the first one and then finds nothing left to revoke, so only one wins.
+    """
+    tokens = RefreshToken.__table__
+    presented = tokens.alias("presented")
+
+    revoked = (
+        update(tokens)
+        .where(
+            tokens.c.user_id == (
+                select(presented.c.user_id)
+                .where(
+                    presented.c.token_id == token_id,
+                    presented.c.is_revoked == False,
+                    presented.c.expires_at > datetime.now(timezone.utc)
+                )
+                .scalar_subquery()
+            ),
+            tokens.c.is_revoked == False
+        )
+        .values(is_revoked=True)
+        .returning(tokens.c.user_id, tokens.c.token_id)
+        .cte("revoked")
+    )
+    stmt = (
+        insert(tokens)
+        .from_select(
+            ["user_id", "token_id", "expires_at", "is_revoked"],
+            select(
+                revoked.c.user_id,
+                literal(new_token_id, String),
+                literal(new_expires_at, DateTime(timezone=True)),
+                literal(False, Boolean)
+            ).where(revoked.c.token_id == token_id)
+        )
+        .returning(tokens.c.user_id)
+    )
+
+    result = await db.execute(stmt)
+    user_id = result.scalar()
+    await db.commit()
+    return user_id
+
+async def get_refresh_token(db: AsyncSession, token_id: str, user_id: int):
     logger.debug(f"Looking up refresh token - token_id: {token_id}, user_id: {user_id}")
-    token = db.query(RefreshToken).filter(
-        RefreshToken.token_id == token_id,
-        RefreshToken.user_id == user_id,
-        RefreshToken.is_revoked == False,
-        RefreshToken.expires_at > datetime.utcnow()
-    ).first()
-    
+    result = await db.execute(
+        select(RefreshToken).where(
+            RefreshToken.token_id == token_id,
+            RefreshToken.user_id == user_id,
+            RefreshToken.is_revoked == False,
+            RefreshToken.expires_at > datetime.now(timezone.utc)
+        )
+    )
+    token = result.scalars().first()
+
     if token:
         logger.debug("Refresh token found and valid")
     else:
         logger.warning("Refresh token not found or invalid")
     return token
 
-def invalidate_refresh_token(db: Session, user_id: int):
-    db.query(RefreshToken).filter(
-        RefreshToken.user_id == user_id,
-        RefreshToken.is_revoked == False
-    ).update({"is_revoked": True})
-    db.commit()  # Added missing parentheses
-    
-def cleanup_expired_tokens(db: Session):
-    """Remove expired refresh tokens from the database"""
-    db.query(RefreshToken).filter(
-        RefreshToken.expires_at < datetime.utcnow()
-    ).delete()
-    db.commit()
-    
-def get_user_by_email(db: Session, email: str):
-    return db.query(UserModel).filter(UserModel.email == email).first()
-
-def get_user_by_id(db: Session, user_id: int):
-    return db.query(UserModel).filter(UserModel.id == user_id).first()
-
-def get_users(db: Session, skip: int = 0, limit: int = 100):
-    return db.query(UserModel).offset(skip).limit(limit).all()
-
-def create_user(db: Session, user: UserCreateSchema):
-    hashed_password = get_password_hash(user.password)
+async def invalidate_refresh_token(db: AsyncSession, user_id: int):
+    await db.execute(
+        update(RefreshToken)
+        .where(
+            RefreshToken.user_id == user_id,
+            RefreshToken.is_revoked == False
+        )
+        .values(is_revoked=True)
+    )
+    await db.commit()
+
+async def cleanup_expired_tokens(db: AsyncSession, batch_size: int = 1000) -> int:
+    """
+    Remove expired refresh tokens from the database in batches, committing
+    after each batch so no single statement holds locks on the whole table.
+    Rows locked by a concurrent sweeper are skipped.
+    """
+    tokens = RefreshToken.__table__
+    expired = tokens.alias("expired")
+    total_deleted = 0
+
+    while True:
+        batch = (
+            select(expired.c.id)
+            .where(expired.c.expires_at < datetime.now(timezone.utc))
+            .limit(batch_size)
+            .with_for_update(skip_locked=True)
+        )
+        result = await db.execute(delete(tokens).where(tokens.c.id.in_(batch)))
+        await db.commit()
+
+        total_deleted += result.rowcount
+        if result.rowcount < batch_size:
+            return total_deleted
+
+async def get_user_by_email(db: AsyncSession, email: str):
+    result = await db.execute(select(UserModel).where(UserModel.email == email))
+    return result.scalars().first()
+
+async def get_user_by_id(db: AsyncSession, user_id: int):
+    result = await db.execute(select(UserModel).where(UserModel.id == user_id))
+    return result.scalars().first()
+
+async def get_user_with_details(db: AsyncSession, user_id: int):
+    """Get a user with the user_details graph and preferences eagerly loaded"""
+    result = await db.execute(
+        select(UserModel)
+        .where(UserModel.id == user_id)
+        .options(*_user_details_options(), joinedload(UserModel.user_preferences))
+        .execution_options(populate_existing=True)
+    )
+    return result.scalars().first()
+
+async def load_user_profile(
+    db: AsyncSession,
+    user_id: int,
+    include_details: bool = True,
+    include_preferences: bool = True
+) -> Optional[UserProfileSnapshot]:
+    """
+    Load the user's profile graph in one joined query and return it as an
+    immutable snapshot, for chat context building and profile responses.
+
+    Relationships left out via the include flags are neither joined nor set
+    on the snapshot.
+    """
+    options = []
+    if include_details:
+        options.extend(_user_details_options())
+    if include_preferences:
+        options.append(joinedload(UserModel.user_preferences))
+
+    result = await db.execute(
+        select(UserModel)
+        .where(UserModel.id == user_id)
+        .options(*options)
+        .execution_options(populate_existing=True)
+    )
+    user = result.scalars().first()
+    if not user:
+        return None
+    return UserProfileSnapshot.from_model(
+        user,
+        include_details=include_details,
+        include_preferences=include_preferences
+    )
+
+async def get_users(db: AsyncSession, skip: int = 0, limit: int = 100):
+    result = await db.execute(select(UserModel).offset(skip).limit(limit))
+    return result.scalars().all()
+
+async def create_user(db: AsyncSession, user: UserCreateSchema, hashed_password: str):
     db_user = UserModel(
         email=user.email,
         username=user.username,
         hashed_password=hashed_password
     )
     db.add(db_user)
-    db.commit()
-    db.refresh(db_user)
+    await db.commit()
+    # Pick up server defaults such as created_at
+    await db.refresh(db_user)
     return db_user
 
-def update_user_profile(db: Session, user_id: int, user_update: UserUpdateSchema):
-    db_user = get_user_by_id(db, user_id)
+async def update_user_profile(db: AsyncSession, user_id: int, user_update: UserUpdateSchema):
+    db_user = await get_user_with_details(db, user_id)
     if not db_user:
         return None
 
     try:
+        # Children are attached through relationships rather than foreign keys so
+        # nothing has to be flushed and lazily re-loaded mid-update.
         # Update UserDetailsModel
         if user_update.user_details:
-            if not db_user.user_details:
+            details_data = user_update.user_details.dict(exclude={'body_measurements', 'style_preferences'})
+            user_details = db_user.user_details
+            if not user_details:
                 # Create new UserDetailsModel if it doesn't exist
-                user_details = UserDetailsModel(
-                    user_id=user_id,
-                    **user_update.user_details.dict(exclude={'body_measurements', 'style_preferences'})
-                )
-                db.add(user_details)
-                db.flush()  # Flush to get the user_details.id
+                user_details = UserDetailsModel(**details_data)
+                db_user.user_details = user_details
             else:
                 # Update existing UserDetailsModel
-                for key, value in user_update.user_details.dict(exclude={'body_measurements', 'style_preferences'}).items():
-                    setattr(db_user.user_details, key, value)
-
-            # Ensure user_details is attached to db_user
-            if not db_user.user_details:
-                db.refresh(db_user)
+                for key, value in details_data.items():
+                    setattr(user_details, key, value)
 
             # Handle BodyMeasurementsModel
             if user_update.user_details.body_measurements:
-                if not hasattr(db_user.user_details, 'body_measurements') or not db_user.user_details.body_measurements:
+                measurements_data = user_update.user_details.body_measurements.dict()
+                if not user_details.body_measurements:
                     # Create new BodyMeasurementsModel
-                    body_measurements = BodyMeasurementsModel(
-                        user_details_id=db_user.user_details.id,
-                        **user_update.user_details.body_measurements.dict()
-                    )
-                    db.add(body_measurements)
+                    user_details.body_measurements = BodyMeasurementsModel(**measurements_data)
                 else:
                     # Update existing BodyMeasurementsModel
-                    for key, value in user_update.user_details.body_measurements.dict().items():
-                        setattr(db_user.user_details.body_measurements, key, value)
+                    for key, value in measurements_data.items():
+                        setattr(user_details.body_measurements, key, value)
 
             # Handle StylePreferencesModel
             if user_update.user_details.style_preferences:
                 style_prefs = user_update.user_details.style_preferences
-                if not hasattr(db_user.user_details, 'style_preferences') or not db_user.user_details.style_preferences:
-                    # Create new StylePreferencesModel
-                    new_style_prefs = StylePreferencesModel(
-                        user_details_id=db_user.user_details.id,
+                if not user_details.style_preferences:
+                    # Create new StylePreferencesModel with its BudgetModel and ShoppingHabits
+                    user_details.style_preferences = StylePreferencesModel(
                         favorite_colors=style_prefs.favorite_colors,
                         preferred_brands=style_prefs.preferred_brands,
-                        lifestyle_choices=style_prefs.lifestyle_choices
-                    )
-                    db.add(new_style_prefs)
-                    db.flush()
-
-                    # Create BudgetModel
-                    budget = BudgetModel(
-                        style_preferences_id=new_style_prefs.id,
-                        min_amount=style_prefs.budget.min_amount,
-                        max_amount=style_prefs.budget.max_amount
-                    )
-                    db.add(budget)
-
-                    # Create ShoppingHabits
-                    shopping_habits = ShoppingHabitsModel(
-                        style_preferences_id=new_style_prefs.id,
-                        frequency=style_prefs.shopping_habits.frequency,
-                        preferred_retailers=style_prefs.shopping_habits.preferred_retailers
+                        lifestyle_choices=style_prefs.lifestyle_choices,
+                        budget=BudgetModel(
+                            min_amount=style_prefs.budget.min_amount,
+                            max_amount=style_prefs.budget.max_amount
+                        ),
+                        shopping_habits=ShoppingHabitsModel(
+                            frequency=style_prefs.shopping_habits.frequency,
+                            preferred_retailers=style_prefs.shopping_habits.preferred_retailers
+                        )
                     )
-                    db.add(shopping_habits)
                 else:
                     # Update existing StylePreferencesModel
-                    existing_style_prefs = db_user.user_details.style_preferences
+                    existing_style_prefs = user_details.style_preferences
                     for key, value in style_prefs.dict(exclude={'budget', 'shopping_habits'}).items():
                         setattr(existing_style_prefs, key, value)
 
@@ -151,41 +267,33 @@ def update_user_profile(db: Session, user_id: int, user_update: UserUpdateSchema
                         for key, value in style_prefs.budget.dict().items():
                             setattr(existing_style_prefs.budget, key, value)
                     else:
-                        budget = BudgetModel(
-                            style_preferences_id=existing_style_prefs.id,
+                        existing_style_prefs.budget = BudgetModel(
                             min_amount=style_prefs.budget.min_amount,
                             max_amount=style_prefs.budget.max_amount
                         )
-                        db.add(budget)
 
                     # Update ShoppingHabits
                     if existing_style_prefs.shopping_habits:
                         for key, value in style_prefs.shopping_habits.dict().items():
                             setattr(existing_style_prefs.shopping_habits, key, value)
                     else:
-                        shopping_habits = ShoppingHabitsModel(
-                            style_preferences_id=existing_style_prefs.id,
+                        existing_style_prefs.shopping_habits = ShoppingHabitsModel(
                             frequency=style_prefs.shopping_habits.frequency,
                             preferred_retailers=style_prefs.shopping_habits.preferred_retailers
                         )
-                        db.add(shopping_habits)
 
         # Update UserPreferences
         if user_update.user_preferences:
             if not db_user.user_preferences:
-                user_preferences = UserPreferencesModel(
-                    user_id=user_id,
-                    **user_update.user_preferences.dict()
-                )
-                db.add(user_preferences)
+                db_user.user_preferences = UserPreferencesModel(**user_update.user_preferences.dict())
             else:
                 for key, value in user_update.user_preferences.dict().items():
                     setattr(db_user.user_preferences, key, value)
 
-        db.commit()
-        db.refresh(db_user)
-        return db_user
+        db_user.profile_version = UserModel.profile_version + 1
+        await db.commit()
+        return await load_user_profile(db, user_id)
 
     except Exception as e:
-        db.rollback()
-        raise e
\ No newline at end of file
+        await db.rollback()
+        raise e
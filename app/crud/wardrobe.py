@@ -1,65 +1,628 @@
 #crud/wardrobe.py
-from sqlalchemy.orm import Session
+import json
+import uuid
+from datetime import datetime
+from sqlalchemy import select, insert, update, delete, text, tuple_, literal, literal_column, func, or_, cast, true, Float, String
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import aliased, selectinload
 
 from app.enums.enums import CategoryEnum
-from ..models.models import ItemModel, TagModel
-from ..schemas.schemas import ItemCreateSchema
-from typing import List
+from ..config import get_settings
+from ..models.models import ItemModel, TagModel, UserModel, WardrobeStatsModel, item_tags, items_archive, item_tags_archive
+from ..schemas.schemas import ItemCreateSchema, ItemBatchUpdateSchema, ItemFilterSchema
+from ..utils.cache import TTLCache
+from ..utils.pagination import encode_cursor, decode_cursor
+from ..utils.response_cache import listing_cache
+from typing import Dict, Iterable, List, Optional, Tuple
 from uuid import UUID
 from sqlalchemy.exc import SQLAlchemyError
 import logging
 
 logger = logging.getLogger(__name__)
 
-def get_item(db: Session, item_id: UUID):
-    return db.query(ItemModel).filter(ItemModel.id == item_id).first()
+settings = get_settings()
 
-def get_user_items_by_category(
-    db: Session, 
-    user_id: UUID, 
+# Tag name -> id. Tags are never renamed or deleted, so an id stays valid once
+# its row is committed; only committed ids are cached (see _remember_tag_ids).
+tag_cache = TTLCache(maxsize=settings.TAG_CACHE_MAXSIZE, ttl=settings.TAG_CACHE_TTL_SECONDS)
+
+async def get_item(db: AsyncSession, item_id: UUID):
+    result = await db.execute(
+        select(ItemModel)
+        .where(ItemModel.id == item_id)
+        .options(selectinload(ItemModel.tags))
+    )
+    return result.scalars().first()
+
+async def get_user_item(db: AsyncSession, item_id: UUID, user_id: UUID) -> Optional[ItemModel]:
+    """Get a non-deleted item owned by the user, with its tags loaded"""
+    result = await db.execute(
+        select(ItemModel)
+        .where(
+            ItemModel.id == item_id,
+            ItemModel.user_id == user_id,
+            ItemModel.is_deleted == False
+        )
+        .options(selectinload(ItemModel.tags))
+        .execution_options(populate_existing=True)
+    )
+    return result.scalars().first()
+
+async def _lock_user_item(db: AsyncSession, item_id: UUID, user_id: UUID) -> Optional[ItemModel]:
+    """
+    get_user_item, but the item row stays locked until the transaction ends.
+    Call after _next_wardrobe_version so the read sees every earlier write
+    and the deltas computed from it cannot be applied twice.
+    """
+    result = await db.execute(
+        select(ItemModel)
+        .where(
+            ItemModel.id == item_id,
+            ItemModel.user_id == user_id,
+            ItemModel.is_deleted == False
+        )
+        .options(selectinload(ItemModel.tags))
+        .with_for_update(of=ItemModel)
+        .execution_options(populate_existing=True)
+    )
+    return result.scalars().first()
+
+async def get_items_by_ids(db: AsyncSession, user_id: UUID, item_ids: List[UUID]) -> List[ItemModel]:
+    """
+    Get the user's non-deleted items with the given ids in a single IN query,
+    tags loaded. Ids that are unknown, deleted or owned by someone else are
+    skipped; the rest keep the order of `item_ids`.
+    """
+    if not item_ids:
+        return []
+    result = await db.execute(
+        select(ItemModel)
+        .where(
+            ItemModel.id.in_(set(item_ids)),
+            ItemModel.user_id == user_id,
+            ItemModel.is_deleted == False
+        )
+        .options(selectinload(ItemModel.tags))
+    )
+    items_by_id = {item.id: item for item in result.scalars().all()}
+    return [items_by_id[item_id] for item_id in dict.fromkeys(item_ids) if item_id in items_by_id]
+
+async def get_user_items_by_category(
+    db: AsyncSession,
+    user_id: UUID,
     category: CategoryEnum,
-    skip: int = 0, 
+    skip: int = 0,
     limit: int = 100
 ) -> List[ItemModel]:
     """
     Retrieve user items filtered by category.
-    
+
     Args:
         db: Database session
         user_id: ID of the user
         category: Category to filter by
         skip: Number of items to skip
         limit: Maximum number of items to return
-        
+
     Returns:
         List of items matching the category
     """
-    return (
-        db.query(ItemModel)
-        .filter(
+    result = await db.execute(
+        select(ItemModel)
+        .where(
+            ItemModel.user_id == user_id,
+            ItemModel.category == category,
+            ItemModel.is_deleted == False
+        )
+        .options(selectinload(ItemModel.tags))
+        .order_by(ItemModel.created_at.desc(), ItemModel.id.desc())
+        .offset(skip)
+        .limit(limit)
+    )
+    return result.scalars().all()
+
+async def get_user_items_page(
+    db: AsyncSession,
+    user_id: UUID,
+    category: CategoryEnum,
+    limit: int = 50,
+    cursor: Optional[str] = None
+) -> Tuple[List[ItemModel], Optional[str]]:
+    """
+    Retrieve a page of user items in a category using keyset pagination.
+
+    Items are ordered newest first on (created_at, id), so each page is an index
+    range scan no matter how deep it is, unlike offset pagination.
+
+    Args:
+        db: Database session
+        user_id: ID of the user
+        category: Category to filter by
+        limit: Maximum number of items to return
+        cursor: `next_cursor` from the previous page, or None for the first page
+
+    Returns:
+        The items and the cursor for the next page (None on the last page)
+
+    Raises:
+        ValueError: If the cursor is invalid
+    """
+    return await _newest_first_page(
+        db,
+        [
             ItemModel.user_id == user_id,
             ItemModel.category == category,
             ItemModel.is_deleted == False
+        ],
+        limit=limit,
+        cursor=cursor
+    )
+
+async def get_filtered_items_page(
+    db: AsyncSession,
+    user_id: UUID,
+    filters: ItemFilterSchema,
+    limit: int = 50,
+    cursor: Optional[str] = None
+) -> Tuple[List[ItemModel], Optional[str]]:
+    """
+    Retrieve a page of the user's items matching `filters`, newest first,
+    using the same keyset pagination as `get_user_items_page`.
+
+    Raises:
+        ValueError: If the cursor is invalid
+    """
+    return await _newest_first_page(db, _item_filter_conditions(user_id, filters), limit=limit, cursor=cursor)
+
+async def get_item_facet_counts(db: AsyncSession, user_id: UUID, filters: ItemFilterSchema) -> dict:
+    """
+    Count the items matching `filters` per category, color, brand and tag in
+    one query: the filtered items are expanded to one row per (color, tag)
+    and grouped by GROUPING SETS, counting distinct items in each group.
+
+    Counts are for the filtered set (they narrow as filters are added).
+    Items without a brand, color or tag are not counted under that facet.
+    """
+    filtered = (
+        select(ItemModel.id, ItemModel.category, ItemModel.brand, ItemModel.colors)
+        .where(*_item_filter_conditions(user_id, filters))
+        .cte("filtered")
+    )
+    colors = func.unnest(filtered.c.colors).table_valued("color").render_derived(name="item_colors")
+    columns = {
+        "categories": cast(filtered.c.category, String),
+        "brands": filtered.c.brand,
+        "colors": colors.c.color,
+        "tags": TagModel.name,
+    }
+
+    stmt = (
+        select(
+            *[func.grouping(column).label(f"{facet}_grouping") for facet, column in columns.items()],
+            *[column.label(facet) for facet, column in columns.items()],
+            func.count(filtered.c.id.distinct()).label("count")
+        )
+        .select_from(filtered)
+        .outerjoin(colors, true())
+        .outerjoin(item_tags, item_tags.c.item_id == filtered.c.id)
+        .outerjoin(TagModel, TagModel.id == item_tags.c.tag_id)
+        .group_by(func.grouping_sets(*[tuple_(column) for column in columns.values()]))
+    )
+    result = await db.execute(stmt)
+
+    facets = {facet: {} for facet in columns}
+    for row in result.mappings():
+        for facet in columns:
+            # grouping() is 0 for the column this grouping set groups by
+            if row[f"{facet}_grouping"] == 0 and row[facet] is not None:
+                facets[facet][row[facet]] = row["count"]
+    return facets
+
+def _item_filter_conditions(user_id: UUID, filters: ItemFilterSchema) -> list:
+    conditions = [ItemModel.user_id == user_id, ItemModel.is_deleted == False]
+    if filters.categories:
+        conditions.append(ItemModel.category.in_([category.value for category in filters.categories]))
+    if filters.colors:
+        conditions.append(ItemModel.colors.overlap(filters.colors))
+    if filters.brands:
+        conditions.append(ItemModel.brand.in_(filters.brands))
+    if filters.sizes:
+        conditions.append(ItemModel.size.in_(filters.sizes))
+    if filters.min_price is not None:
+        conditions.append(ItemModel.price >= filters.min_price)
+    if filters.max_price is not None:
+        conditions.append(ItemModel.price <= filters.max_price)
+    if filters.is_favorite is not None:
+        conditions.append(ItemModel.is_favorite == filters.is_favorite)
+    if filters.tags:
+        # Correlated, so only the links of the user's candidate items are
+        # probed (on the item_tags primary key), not every user's tag matches
+        conditions.append(
+            select(item_tags.c.item_id)
+            .join(TagModel, TagModel.id == item_tags.c.tag_id)
+            .where(item_tags.c.item_id == ItemModel.id, TagModel.name.in_(filters.tags))
+            .exists()
+        )
+    return conditions
+
+async def _newest_first_page(
+    db: AsyncSession,
+    conditions: list,
+    limit: int,
+    cursor: Optional[str]
+) -> Tuple[List[ItemModel], Optional[str]]:
+    """Keyset-paginate the items matching `conditions` on (created_at, id), newest first"""
+    query = (
+        select(ItemModel)
+        .where(*conditions)
+        .options(selectinload(ItemModel.tags))
+        .order_by(ItemModel.created_at.desc(), ItemModel.id.desc())
+        .limit(limit + 1)  # One extra row tells us whether there is a next page
+    )
+    if cursor:
+        created_at, item_id = decode_cursor(cursor, size=2)
+        if not isinstance(created_at, str) or not isinstance(item_id, str):
+            raise ValueError("Invalid cursor")
+        try:
+            created_at, item_id = datetime.fromisoformat(created_at), UUID(item_id)
+        except ValueError:
+            raise ValueError("Invalid cursor")
+        query = query.where(
+            tuple_(ItemModel.created_at, ItemModel.id) < tuple_(literal(created_at), literal(item_id))
+        )
+
+    result = await db.execute(query)
+    items = result.scalars().all()
+
+    next_cursor = None
+    if len(items) > limit:
+        items = items[:limit]
+        next_cursor = encode_cursor(items[-1].created_at, items[-1].id)
+    return items, next_cursor
+
+async def search_user_items(
+    db: AsyncSession,
+    user_id: UUID,
+    query: str,
+    limit: int = 50,
+    cursor: Optional[str] = None
+) -> Tuple[List[ItemModel], Optional[str]]:
+    """
+    Search the user's non-deleted items by name, brand, description, notes
+    and tag names, best matches first.
+
+    An item matches on full-text search over its `search_vector`, or on fuzzy
+    (trigram word similarity) matches against its name or one of its tag
+    names, so typos like "dres" still find "Summer Dress". All three
+    predicates are served by GIN indexes. The rank adds the full-text rank to
+    the best fuzzy similarity.
+
+    Results are keyset-paginated on (rank, id).
+
+    Args:
+        db: Database session
+        user_id: ID of the user
+        query: Free-text search query (websearch syntax: quotes, OR, -word)
+        limit: Maximum number of items to return
+        cursor: `next_cursor` from the previous page, or None for the first page
+
+    Returns:
+        The items and the cursor for the next page (None on the last page)
+
+    Raises:
+        ValueError: If the cursor is invalid
+    """
+    ts_query = func.websearch_to_tsquery(literal_column("'english'::regconfig"), query)
+    search_term = literal(query)
+
+    tag_match = (
+        select(func.max(func.word_similarity(search_term, TagModel.name)))
+        .select_from(item_tags.join(TagModel, TagModel.id == item_tags.c.tag_id))
+        .where(item_tags.c.item_id == ItemModel.id, search_term.op("<%", is_comparison=True)(TagModel.name))
+        .scalar_subquery()
+    )
+    rank = cast(
+        func.ts_rank_cd(ItemModel.search_vector, ts_query)
+        + func.greatest(func.word_similarity(search_term, ItemModel.name), func.coalesce(tag_match, 0)),
+        Float
+    )
+    # Restricted to the user's items, so a common tag name does not pull in
+    # every user's matches; aliased so it is not correlated with the outer items
+    tagged_item = aliased(ItemModel)
+    tagged_items = (
+        select(item_tags.c.item_id)
+        .join(TagModel, TagModel.id == item_tags.c.tag_id)
+        .join(tagged_item, tagged_item.id == item_tags.c.item_id)
+        .where(
+            tagged_item.user_id == user_id,
+            tagged_item.is_deleted == False,
+            search_term.op("<%", is_comparison=True)(TagModel.name)
+        )
+    )
+    ranked = (
+        select(ItemModel.id.label("id"), rank.label("rank"))
+        .where(
+            ItemModel.user_id == user_id,
+            ItemModel.is_deleted == False,
+            or_(
+                ItemModel.search_vector.op("@@", is_comparison=True)(ts_query),
+                search_term.op("<%", is_comparison=True)(ItemModel.name),
+                ItemModel.id.in_(tagged_items)
+            )
+        )
+        .subquery("ranked")
+    )
+
+    stmt = (
+        select(ItemModel, ranked.c.rank)
+        .join(ranked, ranked.c.id == ItemModel.id)
+        .options(selectinload(ItemModel.tags))
+        .order_by(ranked.c.rank.desc(), ranked.c.id.desc())
+        .limit(limit + 1)  # One extra row tells us whether there is a next page
+    )
+    if cursor:
+        last_rank, item_id = decode_cursor(cursor, size=2)
+        if not isinstance(last_rank, (int, float)) or not isinstance(item_id, str):
+            raise ValueError("Invalid cursor")
+        try:
+            item_id = UUID(item_id)
+        except ValueError:
+            raise ValueError("Invalid cursor")
+        stmt = stmt.where(
+            tuple_(ranked.c.rank, ranked.c.id) < tuple_(literal(float(last_rank), Float), literal(item_id))
+        )
+
+    result = await db.execute(stmt)
+    rows = result.all()
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last_item, last_rank = rows[-1]
+        next_cursor = encode_cursor(last_rank, last_item.id)
+    return [item for item, _ in rows], next_cursor
+
+async def get_item_changes(
+    db: AsyncSession,
+    user_id: UUID,
+    since: int,
+    limit: int = 500,
+    cursor: Optional[str] = None
+) -> dict:
+    """
+    Items created, modified or soft-deleted since the wardrobe version
+    `since`, oldest change first, keyset-paginated on (version, id).
+
+    Returns a dict with `items` (live items), `deleted` (soft-deleted items,
+    as tombstones), `next_cursor`, `version` (the version to sync from next
+    time; only on the last page) and `full_resync`, set when tombstones newer
+    than `since` have already been archived.
+
+    Raises:
+        ValueError: If the cursor is invalid
+    """
+    if cursor:
+        last_version, item_id = decode_cursor(cursor, size=2)
+        if not isinstance(last_version, int) or not isinstance(item_id, str):
+            raise ValueError("Invalid cursor")
+        try:
+            item_id = UUID(item_id)
+        except ValueError:
+            raise ValueError("Invalid cursor")
+
+    # Read before the items: every change up to this version has committed
+    result = await db.execute(
+        select(UserModel.wardrobe_version, UserModel.wardrobe_purged_version).where(UserModel.id == user_id)
+    )
+    current_version, purged_version = result.one()
+    if 0 < since < purged_version:
+        return {"items": [], "deleted": [], "version": None, "next_cursor": None, "full_resync": True}
+
+    query = (
+        select(ItemModel)
+        .where(ItemModel.user_id == user_id, ItemModel.version > since, ItemModel.version <= current_version)
+        .options(selectinload(ItemModel.tags))
+        .order_by(ItemModel.version, ItemModel.id)
+        .limit(limit + 1)  # One extra row tells us whether there is a next page
+        .execution_options(include_deleted=True)
+    )
+    if cursor:
+        query = query.where(tuple_(ItemModel.version, ItemModel.id) > tuple_(literal(last_version), literal(item_id)))
+
+    result = await db.execute(query)
+    items = result.scalars().all()
+
+    next_cursor = None
+    if len(items) > limit:
+        items = items[:limit]
+        next_cursor = encode_cursor(items[-1].version, items[-1].id)
+    return {
+        "items": [item for item in items if not item.is_deleted],
+        "deleted": [item for item in items if item.is_deleted],
+        "version": None if next_cursor else current_version,
+        "next_cursor": next_cursor,
+        "full_resync": False
+    }
+
+async def estimate_user_items_count(db: AsyncSession, user_id: UUID, category: CategoryEnum) -> int:
+    """
+    Cheap row-count estimate for a category listing, taken from the planner
+    (EXPLAIN) instead of running COUNT(*) over the user's items.
+    """
+    query = select(ItemModel.id).where(
+        ItemModel.user_id == user_id,
+        ItemModel.category == category,
+        ItemModel.is_deleted == False
+    )
+    compiled = query.compile(dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True})
+    result = await db.execute(text(f"EXPLAIN (FORMAT JSON) {compiled}"))
+    plan = result.scalar()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]["Plan"]["Plan Rows"])
+
+async def get_wardrobe_summary(db: AsyncSession, user_id: UUID) -> dict:
+    """
+    Summarise the user's non-deleted items: counts per category, favorites
+    and total value. Reads the user's (at most one per category) rows of the
+    incrementally maintained wardrobe_stats table instead of the items.
+    """
+    result = await db.execute(
+        select(
+            WardrobeStatsModel.category,
+            WardrobeStatsModel.item_count,
+            WardrobeStatsModel.favorite_count,
+            WardrobeStatsModel.total_value
         )
+        .where(WardrobeStatsModel.user_id == user_id, WardrobeStatsModel.item_count > 0)
+    )
+
+    summary = {"total_items": 0, "favorite_count": 0, "total_value": 0.0, "category_counts": {}}
+    for category, count, favorite_count, total_value in result.all():
+        summary["category_counts"][category] = count
+        summary["total_items"] += count
+        summary["favorite_count"] += favorite_count
+        summary["total_value"] += float(total_value)
+    return summary
+
+async def get_user_items(db: AsyncSession, user_id: int, skip: int = 0, limit: int = 100):
+    result = await db.execute(
+        select(ItemModel)
+        .where(ItemModel.user_id == user_id)
+        .options(selectinload(ItemModel.tags))
         .offset(skip)
         .limit(limit)
-        .all()
     )
+    return result.scalars().all()
+
+async def get_or_create_tags(db: AsyncSession, tag_ids: List[int]) -> List[TagModel]:
+    result = await db.execute(select(TagModel).where(TagModel.id.in_(tag_ids)))
+    return result.scalars().all()
+
+async def _resolve_tag_ids(db: AsyncSession, tag_names: Iterable[str]) -> Dict[str, UUID]:
+    """
+    Map tag names to ids, creating the tags that don't exist yet.
+
+    Cached names cost nothing; the rest are upserted and looked up in one
+    statement (INSERT ... ON CONFLICT DO NOTHING RETURNING, unioned with the
+    rows that already existed). A tag inserted by a concurrent transaction
+    after that statement's snapshot is picked up by one follow-up SELECT.
+
+    Runs inside the caller's transaction; call `_remember_tag_ids` once it
+    has committed.
+    """
+    tag_ids = {}
+    missing = []
+    for name in dict.fromkeys(tag_names):
+        tag_id = tag_cache.get(name)
+        if tag_id is None:
+            missing.append(name)
+        else:
+            tag_ids[name] = tag_id
+    if not missing:
+        return tag_ids
+    # Concurrent writers insert (and lock) overlapping names in the same order
+    missing = sorted(missing)
+
+    inserted = (
+        pg_insert(TagModel)
+        .values([{"id": uuid.uuid4(), "name": name} for name in missing])
+        .on_conflict_do_nothing(index_elements=[TagModel.name])
+        .returning(TagModel.id, TagModel.name)
+        .cte("inserted")
+    )
+    upsert = select(inserted.c.name, inserted.c.id).union_all(
+        select(TagModel.name, TagModel.id).where(TagModel.name.in_(missing))
+    )
+    result = await db.execute(upsert)
+    tag_ids.update(result.tuples().all())
+
+    raced = [name for name in missing if name not in tag_ids]
+    if raced:
+        result = await db.execute(select(TagModel.name, TagModel.id).where(TagModel.name.in_(raced)))
+        tag_ids.update(result.tuples().all())
+    return tag_ids
 
-def get_user_items(db: Session, user_id: int, skip: int = 0, limit: int = 100):
-    return db.query(ItemModel).filter(ItemModel.user_id == user_id).offset(skip).limit(limit).all()
+def _remember_tag_ids(tag_ids: Dict[str, UUID]) -> None:
+    """Cache resolved tag ids; only call after the transaction that resolved them committed"""
+    for name, tag_id in tag_ids.items():
+        tag_cache.set(name, tag_id)
 
-def get_or_create_tags(db: Session, tag_ids: List[int]) -> List[TagModel]:
-    return db.query(TagModel).filter(TagModel.id.in_(tag_ids)).all()
+async def _add_item_tags(db: AsyncSession, rows: List[dict]) -> None:
+    """Bulk insert item_tags rows ({"item_id", "tag_id"}), ignoring existing links"""
+    if rows:
+        # executemany: SQLAlchemy batches the rows into multi-row INSERTs
+        await db.execute(pg_insert(item_tags).on_conflict_do_nothing(), rows)
 
-def create_item(db: Session, item: ItemCreateSchema, user_id: UUID):
+async def _replace_item_tags(db: AsyncSession, item_id: UUID, tag_ids: Iterable[UUID]) -> None:
+    """Make `tag_ids` the item's exact tag set with one DELETE and one INSERT"""
+    tag_ids = list(tag_ids)
+    stale = delete(item_tags).where(item_tags.c.item_id == item_id)
+    if tag_ids:
+        stale = stale.where(item_tags.c.tag_id.not_in(tag_ids))
+    await db.execute(stale)
+    await _add_item_tags(db, [{"item_id": item_id, "tag_id": tag_id} for tag_id in tag_ids])
+
+def _add_stats_delta(deltas: dict, category, is_favorite: bool, price: Optional[float], sign: int = 1) -> None:
+    """Accumulate one item entering (sign=1) or leaving (sign=-1) the stats of its category"""
+    category = getattr(category, "value", category)
+    delta = deltas.setdefault(category, [0, 0, 0.0])
+    delta[0] += sign
+    delta[1] += sign if is_favorite else 0
+    delta[2] += sign * (price or 0.0)
+
+async def _apply_stats_deltas(db: AsyncSession, user_id: UUID, deltas: dict) -> None:
+    """
+    Add accumulated deltas to the user's wardrobe_stats rows with one upsert,
+    inside the caller's transaction. Rows are written in category order so
+    concurrent writers lock them in the same order.
+    """
+    rows = [
+        {"user_id": user_id, "category": category, "item_count": count, "favorite_count": favorites, "total_value": value}
+        for category, (count, favorites, value) in sorted(deltas.items())
+        if count or favorites or value
+    ]
+    if not rows:
+        return
+    stmt = pg_insert(WardrobeStatsModel).values(rows)
+    await db.execute(stmt.on_conflict_do_update(
+        index_elements=[WardrobeStatsModel.user_id, WardrobeStatsModel.category],
+        set_={
+            "item_count": WardrobeStatsModel.item_count + stmt.excluded.item_count,
+            "favorite_count": WardrobeStatsModel.favorite_count + stmt.excluded.favorite_count,
+            "total_value": WardrobeStatsModel.total_value + stmt.excluded.total_value,
+        }
+    ))
+
+async def _next_wardrobe_version(db: AsyncSession, user_id: UUID) -> int:
+    """
+    Bump and return the user's wardrobe version for the current write. The
+    user row stays locked until commit, so a user's writes commit in version
+    order and a client that has seen version N has seen every change <= N.
+    Call before touching item rows to keep the lock order consistent.
+    """
+    result = await db.execute(
+        update(UserModel)
+        .where(UserModel.id == user_id)
+        # Keep users.updated_at (its onupdate) for profile changes
+        .values(wardrobe_version=UserModel.wardrobe_version + 1, updated_at=UserModel.updated_at)
+        .returning(UserModel.wardrobe_version)
+        .execution_options(synchronize_session=False)
+    )
+    return result.scalar_one()
+
+async def create_item(db: AsyncSession, item: ItemCreateSchema, user_id: UUID):
     logger.info(f"Creating item for user_id: {user_id}")
     try:
+        version = await _next_wardrobe_version(db, user_id)
         db_item = ItemModel(
             user_id=user_id,
+            version=version,
             name=item.name,
             description=item.description,
-            colors=item.colors if item.colors else None,
+            colors=item.colors or [],
             brand=item.brand,
             category=item.category,
             is_favorite=item.is_favorite,
@@ -68,88 +631,340 @@ def create_item(db: Session, item: ItemCreateSchema, user_id: UUID):
             size=item.size
         )
         db.add(db_item)
-        db.flush()  # Flush to assign an ID if needed
+        await db.flush()
 
+        tag_ids = {}
         if item.tags:
             logger.info(f"Processing tags: {item.tags}")
-            existing_tags = db.query(TagModel).filter(TagModel.name.in_(item.tags)).all()
-            existing_tag_names = {tag.name for tag in existing_tags}
-            new_tag_names = set(item.tags) - existing_tag_names
+            tag_ids = await _resolve_tag_ids(db, item.tags)
+            await _add_item_tags(db, [{"item_id": db_item.id, "tag_id": tag_id} for tag_id in tag_ids.values()])
 
-            new_tags = [TagModel(name=tag_name) for tag_name in new_tag_names]
-            db.add_all(new_tags)
-            db.flush()
+        deltas = {}
+        _add_stats_delta(deltas, db_item.category, db_item.is_favorite, db_item.price)
+        await _apply_stats_deltas(db, user_id, deltas)
 
-            all_tags = db.query(TagModel).filter(TagModel.name.in_(item.tags)).all()
-            db_item.tags = all_tags
-            logger.info(f"Associated tags: {[tag.name for tag in all_tags]}")
+        await db.commit()
+        _remember_tag_ids(tag_ids)
+        await listing_cache.invalidate(user_id, deltas)
 
-        db.commit()
-        db.refresh(db_item)
+        # Reload to pick up server defaults such as created_at
+        db_item = await get_user_item(db, db_item.id, user_id)
         logger.info(f"ItemModel created with ID: {db_item.id}")
         return db_item
 
     except SQLAlchemyError as e:
-        db.rollback()
+        await db.rollback()
         logger.error(f"Database error during item creation: {e}")
         raise ValueError("Database error occurred while creating the item.")
-    
-    
-def update_item(db: Session, item_id: UUID, item: ItemCreateSchema, user_id: UUID):
+
+
+async def bulk_create_items(db: AsyncSession, items: List[ItemCreateSchema], user_id: UUID) -> int:
+    """
+    Insert a batch of validated items and their tags in one transaction.
+
+    Tags for the whole batch are resolved with a single upsert, and items and
+    item_tags rows are written with multi-row INSERTs rather than one ORM
+    object per item.
+
+    Raises:
+        ValueError: If the batch could not be written; nothing is inserted
+    """
+    if not items:
+        return 0
+
+    item_rows = []
+    link_names = []
+    deltas = {}
+    for item in items:
+        item_id = uuid.uuid4()
+        data = item.dict(exclude={"tags"})
+        data.update(
+            id=item_id,
+            user_id=user_id,
+            colors=item.colors or [],
+            is_favorite=bool(item.is_favorite),
+            is_deleted=False
+        )
+        item_rows.append(data)
+        link_names.extend((item_id, name) for name in dict.fromkeys(item.tags or []))
+        _add_stats_delta(deltas, item.category, data["is_favorite"], item.price)
+
+    try:
+        version = await _next_wardrobe_version(db, user_id)
+        for data in item_rows:
+            data["version"] = version
+        tag_ids = await _resolve_tag_ids(db, (name for _, name in link_names))
+        await db.execute(insert(ItemModel.__table__), item_rows)
+        await _add_item_tags(db, [{"item_id": item_id, "tag_id": tag_ids[name]} for item_id, name in link_names])
+        await _apply_stats_deltas(db, user_id, deltas)
+        await db.commit()
+    except SQLAlchemyError as e:
+        await db.rollback()
+        logger.error(f"Database error during bulk item import: {e}")
+        raise ValueError("Database error occurred while importing items.")
+
+    _remember_tag_ids(tag_ids)
+    await listing_cache.invalidate(user_id, deltas)
+    return len(item_rows)
+
+async def update_item(db: AsyncSession, item_id: UUID, item: ItemCreateSchema, user_id: UUID):
     logger.info(f"Updating item_id: {item_id} for user_id: {user_id}")
-    db_item = db.query(ItemModel).filter(ItemModel.id == item_id, ItemModel.user_id == user_id, ItemModel.is_deleted == False).first()
-    if not db_item:
-        logger.error("ItemModel not found")
-        return None
+    tag_ids = {}
+    try:
+        # Lock the user, then the item, before reading the values the deltas
+        # are computed from
+        version = await _next_wardrobe_version(db, user_id)
+        db_item = await _lock_user_item(db, item_id, user_id)
+        if not db_item:
+            await db.rollback()
+            logger.error("ItemModel not found")
+            return None
 
-    for key, value in item.dict(exclude_unset=True).items():
-        if key == "tags":
-            continue  # Handle tags separately
-        if key == "colors" and value:
-            setattr(db_item, key, ",".join(value))  # Adjust based on colors field type
-        else:
+        deltas = {}
+        _add_stats_delta(deltas, db_item.category, db_item.is_favorite, db_item.price, sign=-1)
+        for key, value in item.dict(exclude_unset=True).items():
+            if key == "tags":
+                continue  # Handle tags separately
             setattr(db_item, key, value)
+        _add_stats_delta(deltas, db_item.category, db_item.is_favorite, db_item.price)
 
-    if item.tags is not None:
-        if item.tags:
+        db_item.version = version
+        await db.flush()
+        await _apply_stats_deltas(db, user_id, deltas)
+        if item.tags is not None:
             logger.info(f"Processing tags: {item.tags}")
-            existing_tags = db.query(TagModel).filter(TagModel.name.in_(item.tags)).all()
-            existing_tag_names = {tag.name for tag in existing_tags}
-            new_tag_names = set(item.tags) - existing_tag_names
-
-            # Create new tags
-            new_tags = [TagModel(name=tag_name) for tag_name in new_tag_names]
-            db.add_all(new_tags)
-            db.commit()
-
-            # Re-fetch all tags after adding new ones
-            all_tags = db.query(TagModel).filter(TagModel.name.in_(item.tags)).all()
-            db_item.tags = all_tags
-            logger.info(f"Associated tags: {[tag.name for tag in all_tags]}")
-        else:
-            db_item.tags = []
-            logger.info("Cleared all tags for the item.")
+            tag_ids = await _resolve_tag_ids(db, item.tags)
+            await _replace_item_tags(db, item_id, tag_ids.values())
+        await db.commit()
+    except SQLAlchemyError as e:
+        await db.rollback()
+        logger.error(f"Database error during item update: {e}")
+        raise ValueError("Database error occurred while updating the item.")
+    _remember_tag_ids(tag_ids)
+    # The deltas name both the old and the new category
+    await listing_cache.invalidate(user_id, deltas)
 
-    db.commit()
-    db.refresh(db_item)
+    db_item = await get_user_item(db, item_id, user_id)
     logger.info(f"ItemModel updated with ID: {db_item.id}")
     return db_item
 
 
-def delete_item(db: Session, item_id: UUID, user_id: UUID):
-    db_item = db.query(ItemModel).filter(ItemModel.id == item_id, ItemModel.user_id == user_id, ItemModel.is_deleted == False).first()
-    if not db_item:
+async def batch_update_items(db: AsyncSession, patch: ItemBatchUpdateSchema, user_id: UUID) -> List[ItemModel]:
+    """
+    Apply one patch to many of the user's non-deleted items in a single
+    transaction, with set-based statements instead of a load/modify/commit
+    round trip per item:
+
+    - category / is_favorite / delete and the new version: one
+      UPDATE ... RETURNING, plus one wardrobe_stats upsert
+    - remove_tags: one DELETE on item_tags
+    - add_tags: one tag upsert plus one multi-row item_tags INSERT
+
+    Returns the affected items (tags loaded) in the order of `patch.item_ids`;
+    ids that are unknown, deleted or owned by someone else are skipped.
+
+    Raises:
+        ValueError: If the patch could not be applied; nothing is changed
+    """
+    item_ids = list(dict.fromkeys(patch.item_ids))
+    values = {}
+    if patch.category is not None:
+        values["category"] = patch.category
+    if patch.is_favorite is not None:
+        values["is_favorite"] = patch.is_favorite
+    if patch.delete:
+        values["is_deleted"] = True
+        values["deleted_at"] = func.now()
+
+    owned = (
+        ItemModel.id.in_(item_ids),
+        ItemModel.user_id == user_id,
+        ItemModel.is_deleted == False
+    )
+    tag_ids = {}
+    try:
+        # Every patch, tag-only ones included, stamps the items with the new version
+        values["version"] = await _next_wardrobe_version(db, user_id)
+
+        # The locked pre-update rows give the old values for the stats deltas
+        old = (
+            select(ItemModel.id, ItemModel.category, ItemModel.is_favorite, ItemModel.price)
+            .where(*owned)
+            .with_for_update()
+            .subquery("old")
+        )
+        result = await db.execute(
+            update(ItemModel)
+            .where(ItemModel.id == old.c.id)
+            .values(**values)
+            .returning(
+                ItemModel.id, old.c.category, old.c.is_favorite,
+                ItemModel.category, ItemModel.is_favorite, ItemModel.is_deleted, ItemModel.price
+            )
+            .execution_options(synchronize_session=False)
+        )
+        deltas = {}
+        affected_ids = []
+        for item_id, old_category, old_favorite, category, is_favorite, is_deleted, price in result.all():
+            affected_ids.append(item_id)
+            _add_stats_delta(deltas, old_category, old_favorite, price, sign=-1)
+            if not is_deleted:
+                _add_stats_delta(deltas, category, is_favorite, price)
+        await _apply_stats_deltas(db, user_id, deltas)
+
+        if affected_ids and patch.remove_tags:
+            await db.execute(
+                delete(item_tags).where(
+                    item_tags.c.item_id.in_(affected_ids),
+                    item_tags.c.tag_id.in_(select(TagModel.id).where(TagModel.name.in_(patch.remove_tags)))
+                )
+            )
+        if affected_ids and patch.add_tags:
+            tag_ids = await _resolve_tag_ids(db, patch.add_tags)
+            await _add_item_tags(db, [
+                {"item_id": item_id, "tag_id": tag_id}
+                for item_id in affected_ids
+                for tag_id in tag_ids.values()
+            ])
+        await db.commit()
+    except SQLAlchemyError as e:
+        await db.rollback()
+        logger.error(f"Database error during batch item update: {e}")
+        raise ValueError("Database error occurred while updating the items.")
+    _remember_tag_ids(tag_ids)
+    await listing_cache.invalidate(user_id, deltas)
+
+    if not affected_ids:
+        return []
+    result = await db.execute(
+        select(ItemModel)
+        .where(ItemModel.id.in_(affected_ids))
+        .options(selectinload(ItemModel.tags))
+        # Just-deleted items are returned too
+        .execution_options(populate_existing=True, include_deleted=True)
+    )
+    items_by_id = {item.id: item for item in result.scalars().all()}
+    return [items_by_id[item_id] for item_id in item_ids if item_id in items_by_id]
+
+async def delete_item(db: AsyncSession, item_id: UUID, user_id: UUID):
+    """
+    Soft-delete the user's item. The UPDATE only matches a non-deleted row and
+    returns the values the stats deltas are taken from, so deleting an
+    already-deleted item (including concurrently) changes nothing and
+    returns None.
+    """
+    version = await _next_wardrobe_version(db, user_id)
+    result = await db.execute(
+        update(ItemModel)
+        .where(
+            ItemModel.id == item_id,
+            ItemModel.user_id == user_id,
+            ItemModel.is_deleted == False
+        )
+        .values(is_deleted=True, deleted_at=func.now(), version=version)
+        .returning(ItemModel.category, ItemModel.is_favorite, ItemModel.price)
+        .execution_options(synchronize_session=False)
+    )
+    row = result.first()
+    if row is None:
+        await db.rollback()
         return None
-    db_item.is_deleted = True
-    db.commit()
-    db.refresh(db_item)
-    return db_item
 
-def upload_item_image(db: Session, item_id: UUID, image_url: str, user_id: UUID):
-    db_item = db.query(ItemModel).filter(ItemModel.id == item_id, ItemModel.user_id == user_id, ItemModel.is_deleted == False).first()
+    deltas = {}
+    _add_stats_delta(deltas, row.category, row.is_favorite, row.price, sign=-1)
+    await _apply_stats_deltas(db, user_id, deltas)
+    await db.commit()
+    await listing_cache.invalidate(user_id, deltas)
+
+    result = await db.execute(
+        select(ItemModel)
+        .where(ItemModel.id == item_id)
+        .options(selectinload(ItemModel.tags))
+        .execution_options(populate_existing=True, include_deleted=True)
+    )
+    return result.scalars().first()
+
+async def upload_item_image(db: AsyncSession, item_id: UUID, image_url: str, user_id: UUID):
+    version = await _next_wardrobe_version(db, user_id)
+    db_item = await _lock_user_item(db, item_id, user_id)
     if not db_item:
+        await db.rollback()
         return None
+    db_item.version = version
     db_item.image_url = image_url
-    db.commit()
-    db.refresh(db_item)
-    return db_item
\ No newline at end of file
+    await db.commit()
+    await listing_cache.invalidate(user_id, [db_item.category])
+    return db_item
+
+async def archive_deleted_items(db: AsyncSession, deleted_before: datetime, batch_size: int = 500) -> int:
+    """
+    Move items soft-deleted before `deleted_before`, and their item_tags rows,
+    into items_archive / item_tags_archive, committing after each batch so
+    the hot tables only hold short row locks. Rows locked by a concurrent
+    writer or archiver are skipped until the next run.
+
+    Returns the number of items archived.
+    """
+    items = ItemModel.__table__
+    candidates = items.alias("candidates")
+    columns = [column.name for column in items_archive.c if column.name in items.c]
+    total_archived = 0
+
+    while True:
+        result = await db.execute(
+            select(candidates.c.id)
+            .where(candidates.c.is_deleted == True, candidates.c.deleted_at < deleted_before)
+            .limit(batch_size)
+            .with_for_update(skip_locked=True)
+        )
+        item_ids = result.scalars().all()
+        if not item_ids:
+            return total_archived
+
+        # Their tombstones disappear from the change feed; clients that last
+        # synced before them must resync fully
+        purged = (
+            select(items.c.user_id, func.max(items.c.version).label("version"))
+            .where(items.c.id.in_(item_ids))
+            .group_by(items.c.user_id)
+            .subquery("purged")
+        )
+        users = UserModel.__table__
+        await db.execute(
+            update(users)
+            .where(users.c.id == purged.c.user_id)
+            .values(
+                wardrobe_purged_version=func.greatest(users.c.wardrobe_purged_version, purged.c.version),
+                # Keep users.updated_at (its onupdate) for profile changes
+                updated_at=users.c.updated_at
+            )
+        )
+
+        moved_tags = (
+            delete(item_tags)
+            .where(item_tags.c.item_id.in_(item_ids))
+            .returning(item_tags.c.item_id, item_tags.c.tag_id)
+            .cte("moved_tags")
+        )
+        await db.execute(
+            pg_insert(item_tags_archive)
+            .from_select(["item_id", "tag_id"], select(moved_tags.c.item_id, moved_tags.c.tag_id))
+            .on_conflict_do_nothing()
+        )
+
+        moved_items = (
+            delete(items)
+            .where(items.c.id.in_(item_ids))
+            .returning(*[items.c[name] for name in columns])
+            .cte("moved_items")
+        )
+        await db.execute(
+            pg_insert(items_archive)
+            .from_select(columns, select(*[moved_items.c[name] for name in columns]))
+            .on_conflict_do_nothing()
+        )
+        await db.commit()
+
+        total_archived += len(item_ids)
+        if len(item_ids) < batch_size:
+            return total_archived
@@ -1,16 +1,33 @@
 # app/database/base.py
-from sqlalchemy import create_engine
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import Session
 from dotenv import load_dotenv
 from ..config import get_settings
+from ..utils.queries import filter_soft_deleted
 
 load_dotenv()
 settings = get_settings()
 
+# Sync URL is still used by Alembic migrations
 SQLALCHEMY_DATABASE_URL = settings.DATABASE_URL
+ASYNC_SQLALCHEMY_DATABASE_URL = settings.ASYNC_DATABASE_URL
 
-engine = create_engine(SQLALCHEMY_DATABASE_URL)
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+async_engine = create_async_engine(
+    ASYNC_SQLALCHEMY_DATABASE_URL,
+    pool_size=settings.DATABASE_POOL_SIZE,
+    max_overflow=settings.DATABASE_MAX_OVERFLOW,
+    pool_pre_ping=True
+)
+# expire_on_commit=False: async sessions cannot lazily reload expired attributes
+AsyncSessionLocal = async_sessionmaker(
+    bind=async_engine,
+    class_=AsyncSession,
+    autoflush=False,
+    expire_on_commit=False
+)
+# Soft-deleted rows are filtered out of every ORM SELECT
+event.listen(Session, "do_orm_execute", filter_soft_deleted)
 
-Base = declarative_base()
\ No newline at end of file
+Base = declarative_base()
@@ -1,5 +1,6 @@
 # app/database/mongodb.py
 from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import ASCENDING, DESCENDING, IndexModel
 from pymongo.server_api import ServerApi
 
 from dotenv import load_dotenv
@@ -8,6 +9,22 @@ from ..config import get_settings
 load_dotenv()
 settings = get_settings()
 
+# Indexes backing every ChatCRUD query; app/database/query_plans.py checks
+# that none of them falls back to a collection scan
+INDEXES = {
+    "chat_sessions": [
+        # Per-user listing, newest first, and per-user deletes (prefix)
+        IndexModel(
+            [("user_id", ASCENDING), ("updated_at", DESCENDING), ("_id", DESCENDING)],
+            name="user_id_updated_at_id"
+        ),
+    ],
+    "chat_message_buckets": [
+        IndexModel([("session_id", ASCENDING), ("bucket", ASCENDING)], name="session_id_bucket", unique=True),
+        IndexModel([("user_id", ASCENDING)], name="user_id"),
+    ],
+}
+
 
 class MongoDB:
     client: AsyncIOMotorClient = None
@@ -24,11 +41,22 @@ class MongoDB:
             )
             await cls.client.admin.command('ping')
             print(f"Connected to MongoDB at {settings.MONGODB_HOST}!")
+            await cls.ensure_indexes()
 
         except Exception as e:
             print(f"Error connecting to MongoDB: {e}")
             raise
 
+    @classmethod
+    async def ensure_indexes(cls):
+        """
+        Create any missing index in INDEXES. Idempotent: indexes that already
+        exist with the same definition are left alone.
+        """
+        db = cls.get_db()
+        for collection, indexes in INDEXES.items():
+            await db[collection].create_indexes(indexes)
+
     @classmethod
     async def close_mongo_connection(cls):
         if cls.client is not None:
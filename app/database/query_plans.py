@@ -0,0 +1,115 @@
+# app/database/query_plans.py
+"""
+Explain the query shapes issued by ChatCRUD (app/crud/chat.py) and report any
+that Mongo would answer with a collection scan.
+
+    python -m app.database.query_plans
+
+Exits non-zero if a plan contains a COLLSCAN stage, so it can gate a test
+run or deployment against a database with production-like indexes. Keep
+QUERY_SHAPES in step with the queries in ChatCRUD.
+"""
+import asyncio
+import sys
+import uuid
+from datetime import datetime
+from typing import Any, Dict, List
+
+from bson import ObjectId
+
+from .mongodb import MongoDB
+
+# Placeholder values: only the shape of a query matters to the planner
+_SESSION_ID = ObjectId()
+_USER_ID = str(uuid.uuid4())
+_TIMESTAMP = datetime.utcnow()
+
+# (description, collection, operation, arguments)
+QUERY_SHAPES = [
+    ("session by id", "chat_sessions", "find", {"filter": {"_id": _SESSION_ID}}),
+    ("session page of a user", "chat_sessions", "find", {
+        "filter": {"user_id": _USER_ID}, "sort": [("updated_at", -1), ("_id", -1)], "limit": 21
+    }),
+    ("next session page of a user", "chat_sessions", "find", {
+        "filter": {
+            "user_id": _USER_ID,
+            "$or": [
+                {"updated_at": {"$lt": _TIMESTAMP}},
+                {"updated_at": _TIMESTAMP, "_id": {"$lt": _SESSION_ID}}
+            ]
+        },
+        "sort": [("updated_at", -1), ("_id", -1)],
+        "limit": 21
+    }),
+    ("delete sessions of a user", "chat_sessions", "delete", {"filter": {"user_id": _USER_ID}}),
+    ("buckets after a message", "chat_message_buckets", "find", {
+        "filter": {"session_id": _SESSION_ID, "bucket": {"$gte": 1}}, "sort": [("bucket", 1)], "limit": 2
+    }),
+    ("buckets before a message", "chat_message_buckets", "find", {
+        "filter": {"session_id": _SESSION_ID, "bucket": {"$lte": 1}}, "sort": [("bucket", -1)], "limit": 2
+    }),
+    ("buckets of a session", "chat_message_buckets", "find", {
+        "filter": {"session_id": _SESSION_ID}, "sort": [("bucket", 1)]
+    }),
+    ("newest buckets of a session", "chat_message_buckets", "find", {
+        "filter": {"session_id": _SESSION_ID}, "sort": [("bucket", -1)], "limit": 2
+    }),
+    ("delete buckets of a session", "chat_message_buckets", "delete", {"filter": {"session_id": _SESSION_ID}}),
+    ("delete buckets of a user", "chat_message_buckets", "delete", {"filter": {"user_id": _USER_ID}}),
+]
+
+
+def _stages(plan: Any):
+    """Every `stage` name in an explain plan, however deeply nested"""
+    if isinstance(plan, dict):
+        if "stage" in plan:
+            yield plan["stage"]
+        for value in plan.values():
+            yield from _stages(value)
+    elif isinstance(plan, list):
+        for value in plan:
+            yield from _stages(value)
+
+
+async def _explain(collection: str, operation: str, arguments: Dict[str, Any]) -> Dict[str, Any]:
+    db = MongoDB.get_db()
+    if operation == "delete":
+        return await db.command(
+            "explain",
+            {"delete": collection, "deletes": [{"q": arguments["filter"], "limit": 0}]},
+            verbosity="queryPlanner"
+        )
+    cursor = db[collection].find(arguments["filter"])
+    if "sort" in arguments:
+        cursor = cursor.sort(arguments["sort"])
+    if "limit" in arguments:
+        cursor = cursor.limit(arguments["limit"])
+    return await cursor.explain()
+
+
+async def find_collection_scans() -> List[str]:
+    """Descriptions of the QUERY_SHAPES whose winning plan scans a whole collection"""
+    scans = []
+    for description, collection, operation, arguments in QUERY_SHAPES:
+        explained = await _explain(collection, operation, arguments)
+        if "COLLSCAN" in _stages(explained["queryPlanner"]["winningPlan"]):
+            scans.append(f"{description} ({collection})")
+    return scans
+
+
+async def _main() -> int:
+    await MongoDB.connect_to_mongo()
+    try:
+        scans = await find_collection_scans()
+    finally:
+        await MongoDB.close_mongo_connection()
+
+    for scan in scans:
+        print(f"COLLSCAN: {scan}")
+    if not scans:
+        print(f"All {len(QUERY_SHAPES)} chat query plans use an index")
+    return 1 if scans else 0
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(_main()))
@@ -8,3 +8,19 @@ class CategoryEnum(str, enum.Enum):
     ACCESSORIES = "ACCESSORIES"
     INNERWEAR = "INNERWEAR"
     OTHER = "OTHER"
+
+
+class PaginationModeEnum(str, enum.Enum):
+    OFFSET = "offset"
+    CURSOR = "cursor"
+
+
+class UserExpandEnum(str, enum.Enum):
+    USER_DETAILS = "user_details"
+    USER_PREFERENCES = "user_preferences"
+    WARDROBE_SUMMARY = "wardrobe_summary"
+
+
+class ImportFormatEnum(str, enum.Enum):
+    CSV = "csv"
+    NDJSON = "ndjson"
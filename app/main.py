@@ -1,7 +1,11 @@
+import asyncio
 from fastapi import FastAPI
-from .database.base import Base, engine
+from .database.base import Base, async_engine
 from .routes import user, wardrobe, upload, chat
 from .database.mongodb import MongoDB
+from .auth.jwt_handler import password_pool
+from .tasks.refresh_tokens import sweep_expired_refresh_tokens
+from .tasks.item_archive import archive_deleted_items_periodically
 
 from loguru import logger
 import sys
@@ -19,19 +23,25 @@ logger.add(
     retention="10 days",
     level="DEBUG"
 )
-# Create database tables
-Base.metadata.create_all(bind=engine)
-
 app = FastAPI(title="Ai Fashion App", version="0.1")
 
 
 @app.on_event("startup")
 async def startup_db_client():
+    # Create database tables
+    async with async_engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
     await MongoDB.connect_to_mongo()
+    app.state.refresh_token_sweeper = asyncio.create_task(sweep_expired_refresh_tokens())
+    app.state.item_archiver = asyncio.create_task(archive_deleted_items_periodically())
 
 @app.on_event("shutdown")
 async def shutdown_db_client():
+    app.state.refresh_token_sweeper.cancel()
+    app.state.item_archiver.cancel()
     await MongoDB.close_mongo_connection()
+    password_pool.shutdown()
+    await async_engine.dispose()
 
 # Include routers
 app.include_router(user.router, prefix="/api", tags=["users"])
@@ -8,6 +8,12 @@ class Message(BaseModel):
     role: str
     content: str
     timestamp: datetime = Field(default_factory=datetime.utcnow)
+    seq: Optional[int] = None  # Position in the session, from 1; assigned when stored
+
+class MessagePreview(BaseModel):
+    role: str
+    content: str  # Truncated
+    timestamp: datetime
 
 class ChatSession(BaseModel):
     id: Optional[str] = None  # This will store the MongoDB _id as string
@@ -16,6 +22,8 @@ class ChatSession(BaseModel):
     created_at: datetime = Field(default_factory=datetime.utcnow)
     updated_at: datetime = Field(default_factory=datetime.utcnow)
     session_name: Optional[str] = None
+    message_count: int = 0
+    last_message: Optional[MessagePreview] = None
 
     user_context: Optional[Dict] = None
     
@@ -23,3 +31,30 @@ class ChatSession(BaseModel):
         from_attributes = True
         populate_by_name = True
 
+class ChatSessionPage(ChatSession):
+    """
+    A session with one page of its messages, oldest first (see
+    ChatCRUD.get_message_page). `has_more` means messages may remain beyond
+    the page in the direction being read.
+    """
+    has_more: bool = False
+
+class ChatSessionSummary(BaseModel):
+    """A session without its messages, for listings"""
+    id: str
+    session_name: Optional[str] = None
+    created_at: datetime
+    updated_at: datetime
+    message_count: int = 0
+    last_message: Optional[MessagePreview] = None
+
+class ChatHistoryWindow(BaseModel):
+    """
+    A session's metadata plus only its most recent messages, oldest first
+    (see ChatCRUD.get_history_window)
+    """
+    id: str
+    user_id: UUID
+    messages: List[Message] = Field(default_factory=list)
+    user_context: Optional[Dict] = None
+
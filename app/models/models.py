@@ -1,18 +1,34 @@
 from app.enums.enums import CategoryEnum
-from sqlalchemy import Column, Integer, String, Boolean, DateTime, Float, ForeignKey, Table, Enum
-from sqlalchemy.orm import relationship
+from datetime import datetime, timezone
+from sqlalchemy import Column, Integer, BigInteger, String, Boolean, DateTime, Float, ForeignKey, Table, Enum, Index, Computed, DDL, event, text
+from sqlalchemy.orm import deferred, relationship
 from sqlalchemy.sql import func
-from sqlalchemy.dialects.postgresql import ARRAY, UUID as PG_UUID
+from sqlalchemy.dialects.postgresql import ARRAY, TSVECTOR, UUID as PG_UUID
 import uuid
 from app.database.base import Base
+from app.utils.mixin import SoftDeleteMixin
 from sqlalchemy import Enum as SQLAEnum
 
+# Trigram indexes below need pg_trgm; migrations create it too
+event.listen(Base.metadata, "before_create", DDL("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+
+# Weighted full-text document for wardrobe search; tag names live in another
+# table and are matched separately (see search_user_items in crud/wardrobe.py)
+ITEM_SEARCH_VECTOR_SQL = (
+    "setweight(to_tsvector('english'::regconfig, coalesce(name, '')), 'A') || "
+    "setweight(to_tsvector('english'::regconfig, coalesce(brand, '')), 'B') || "
+    "setweight(to_tsvector('english'::regconfig, coalesce(description, '')), 'C') || "
+    "setweight(to_tsvector('english'::regconfig, coalesce(notes, '')), 'D')"
+)
+
 # Association table for Item-Tag many-to-many relationship
 item_tags = Table(
     'item_tags',
     Base.metadata,
     Column('item_id', PG_UUID(as_uuid=True), ForeignKey('items.id'), primary_key=True),
-    Column('tag_id', PG_UUID(as_uuid=True), ForeignKey('tags.id'), primary_key=True)
+    Column('tag_id', PG_UUID(as_uuid=True), ForeignKey('tags.id'), primary_key=True),
+    # Reverse lookup (items by tag); the primary key only covers item_id first
+    Index('ix_item_tags_tag_id_item_id', 'tag_id', 'item_id')
 )
 
 class UserModel(Base):
@@ -26,6 +42,15 @@ class UserModel(Base):
     is_active = Column(Boolean, default=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+    # Bumped by every wardrobe write; items carry the version of their last
+    # change (see GET /api/wardrobe/changes)
+    wardrobe_version = Column(BigInteger, default=0, server_default='0', nullable=False)
+    # Highest item version whose tombstone has been archived away; clients
+    # syncing from before it must resync fully
+    wardrobe_purged_version = Column(BigInteger, default=0, server_default='0', nullable=False)
+    # Bumped by profile writes (details, preferences, picture); with
+    # wardrobe_version it versions the ETags in app/utils/etag.py
+    profile_version = Column(BigInteger, default=0, server_default='0', nullable=False)
 
     # Relationships
     user_details = relationship("UserDetailsModel", back_populates="user", uselist=False, cascade="all, delete")
@@ -107,8 +132,27 @@ class UserPreferencesModel(Base):
     # Relationships
     user = relationship("UserModel", back_populates="user_preferences")
 
-class ItemModel(Base):
+class ItemModel(SoftDeleteMixin, Base):
     __tablename__ = 'items'
+    __table_args__ = (
+        # Category listings; soft-deleted rows are kept out of the index, and
+        # id breaks created_at ties so the whole (created_at, id) keyset order
+        # comes from the index
+        Index(
+            'ix_items_user_category_created_id_active',
+            'user_id', 'category', 'created_at', 'id',
+            postgresql_where=text('is_deleted = false')
+        ),
+        # Array containment/overlap filters on colors
+        Index('ix_items_colors_gin', 'colors', postgresql_using='gin'),
+        # Wardrobe search: full-text, plus fuzzy (trigram) matching on name
+        Index('ix_items_search_vector', 'search_vector', postgresql_using='gin'),
+        Index('ix_items_name_trgm', 'name', postgresql_using='gin', postgresql_ops={'name': 'gin_trgm_ops'}),
+        # Archival job: soft-deleted items past the retention window
+        Index('ix_items_deleted_at_deleted', 'deleted_at', postgresql_where=text('is_deleted = true')),
+        # Delta sync: the user's changes since a version
+        Index('ix_items_user_version', 'user_id', 'version'),
+    )
     id = Column(PG_UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     user_id = Column(PG_UUID(as_uuid=True), ForeignKey('users.id'), nullable=False)
     name = Column(String, nullable=False, index=True)
@@ -121,16 +165,74 @@ class ItemModel(Base):
     notes = Column(String, nullable=True)
     size = Column(String, nullable=True)
     image_url = Column(String, nullable=True)
-    is_deleted = Column(Boolean, default=False, nullable=False)
+    # is_deleted / deleted_at come from SoftDeleteMixin
     created_at = Column(DateTime(timezone=True), server_default=func.now())  
+    # Set in Python on update so the value is known without a reload
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=lambda: datetime.now(timezone.utc))
+    # users.wardrobe_version of the write that last changed the item
+    version = Column(BigInteger, nullable=False)
+    # Only used in WHERE/ORDER BY; never loaded with the row
+    search_vector = deferred(Column(TSVECTOR, Computed(ITEM_SEARCH_VECTOR_SQL, persisted=True)), raiseload=True)
     
     # Relationships
     user = relationship("UserModel", back_populates="wardrobe_items")
-    tags = relationship("TagModel", secondary=item_tags, back_populates="items")
+    # Tags must be loaded in bulk with selectinload(ItemModel.tags); a per-item
+    # lazy load (N+1 over a page of items) raises instead of silently querying
+    tags = relationship("TagModel", secondary=item_tags, back_populates="items", lazy="raise_on_sql")
 
 class TagModel(Base):
     __tablename__ = 'tags'
+    __table_args__ = (
+        # Fuzzy tag matching in wardrobe search
+        Index('ix_tags_name_trgm', 'name', postgresql_using='gin', postgresql_ops={'name': 'gin_trgm_ops'}),
+    )
     id = Column(PG_UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     name = Column(String, unique=True, nullable=False)
 
     items = relationship("ItemModel", secondary=item_tags, back_populates="tags")
+
+class WardrobeStatsModel(Base):
+    """
+    Per-user, per-category item count, favorite count and total value of
+    non-deleted items. Kept up to date by the item writes in crud/wardrobe.py
+    (see _apply_stats_deltas); rebuild with `python -m app.tasks.wardrobe_stats`.
+    """
+    __tablename__ = 'wardrobe_stats'
+
+    user_id = Column(PG_UUID(as_uuid=True), ForeignKey('users.id', ondelete='CASCADE'), primary_key=True)
+    category = Column(SQLAEnum(CategoryEnum), primary_key=True)
+    item_count = Column(Integer, default=0, nullable=False)
+    favorite_count = Column(Integer, default=0, nullable=False)
+    total_value = Column(Float, default=0.0, nullable=False)
+
+# Soft-deleted items past the retention window are moved here, with their tag
+# links, by the archival job (see archive_deleted_items in crud/wardrobe.py).
+# Columns shared with items are copied as-is.
+items_archive = Table(
+    'items_archive',
+    Base.metadata,
+    Column('id', PG_UUID(as_uuid=True), primary_key=True),
+    Column('user_id', PG_UUID(as_uuid=True), nullable=False, index=True),
+    Column('name', String, nullable=False),
+    Column('description', String, nullable=True),
+    Column('colors', ARRAY(String), nullable=False),
+    Column('brand', String, nullable=True),
+    Column('category', SQLAEnum(CategoryEnum), nullable=False),
+    Column('is_favorite', Boolean, nullable=False),
+    Column('price', Float, nullable=True),
+    Column('notes', String, nullable=True),
+    Column('size', String, nullable=True),
+    Column('image_url', String, nullable=True),
+    Column('is_deleted', Boolean, nullable=False),
+    Column('created_at', DateTime(timezone=True)),
+    Column('deleted_at', DateTime(timezone=True)),
+    Column('archived_at', DateTime(timezone=True), server_default=func.now(), nullable=False)
+)
+
+item_tags_archive = Table(
+    'item_tags_archive',
+    Base.metadata,
+    Column('item_id', PG_UUID(as_uuid=True), primary_key=True),
+    Column('tag_id', PG_UUID(as_uuid=True), primary_key=True),
+    Column('archived_at', DateTime(timezone=True), server_default=func.now(), nullable=False)
+)
@@ -1,10 +1,11 @@
-from typing import Generic, TypeVar, List
-from pydantic.generics import GenericModel
+from typing import Generic, TypeVar, List, Optional
+from pydantic import BaseModel
 
 T = TypeVar('T')
 
-class PaginatedResponse(GenericModel, Generic[T]):
-    total: int
-    page: int
-    size: int
+class PaginatedResponse(BaseModel, Generic[T]):
     items: List[T]
+    size: int
+    next_cursor: Optional[str] = None  # Opaque; pass back as `cursor` to get the next page
+    total: Optional[int] = None  # May be an estimate for cursor-paginated listings
+    page: Optional[int] = None
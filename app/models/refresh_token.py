@@ -11,4 +11,4 @@ class RefreshToken(Base):
     token_id = Column(String, unique=True, index=True, nullable=False)  # JTI
     is_revoked = Column(Boolean, default=False)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
-    expires_at = Column(DateTime(timezone=True), nullable=False)
+    expires_at = Column(DateTime(timezone=True), nullable=False, index=True)
@@ -0,0 +1,151 @@
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Optional, Tuple
+from uuid import UUID
+
+from app.models.models import (
+    BodyMeasurementsModel, BudgetModel, ShoppingHabitsModel, StylePreferencesModel,
+    UserDetailsModel, UserModel, UserPreferencesModel
+)
+
+# Immutable, session-independent snapshots of a user's profile graph. They are
+# built once from eagerly loaded models (see load_user_profile in
+# app/crud/user.py), so reading them never triggers a lazy load. Attribute
+# names match the models, so the response schemas validate them directly.
+
+@dataclass(frozen=True, slots=True)
+class BodyMeasurementsSnapshot:
+    id: UUID
+    height: float
+    weight: float
+    body_type: Optional[str]
+
+    @classmethod
+    def from_model(cls, model: Optional[BodyMeasurementsModel]) -> Optional["BodyMeasurementsSnapshot"]:
+        if model is None:
+            return None
+        return cls(id=model.id, height=model.height, weight=model.weight, body_type=model.body_type)
+
+@dataclass(frozen=True, slots=True)
+class BudgetSnapshot:
+    id: UUID
+    min_amount: float
+    max_amount: float
+
+    @classmethod
+    def from_model(cls, model: Optional[BudgetModel]) -> Optional["BudgetSnapshot"]:
+        if model is None:
+            return None
+        return cls(id=model.id, min_amount=model.min_amount, max_amount=model.max_amount)
+
+@dataclass(frozen=True, slots=True)
+class ShoppingHabitsSnapshot:
+    id: UUID
+    frequency: str
+    preferred_retailers: Tuple[str, ...]
+
+    @classmethod
+    def from_model(cls, model: Optional[ShoppingHabitsModel]) -> Optional["ShoppingHabitsSnapshot"]:
+        if model is None:
+            return None
+        return cls(
+            id=model.id,
+            frequency=model.frequency,
+            preferred_retailers=tuple(model.preferred_retailers or ())
+        )
+
+@dataclass(frozen=True, slots=True)
+class StylePreferencesSnapshot:
+    id: UUID
+    favorite_colors: Tuple[str, ...]
+    preferred_brands: Tuple[str, ...]
+    lifestyle_choices: Tuple[str, ...]
+    budget: Optional[BudgetSnapshot]
+    shopping_habits: Optional[ShoppingHabitsSnapshot]
+
+    @classmethod
+    def from_model(cls, model: Optional[StylePreferencesModel]) -> Optional["StylePreferencesSnapshot"]:
+        if model is None:
+            return None
+        return cls(
+            id=model.id,
+            favorite_colors=tuple(model.favorite_colors or ()),
+            preferred_brands=tuple(model.preferred_brands or ()),
+            lifestyle_choices=tuple(model.lifestyle_choices or ()),
+            budget=BudgetSnapshot.from_model(model.budget),
+            shopping_habits=ShoppingHabitsSnapshot.from_model(model.shopping_habits)
+        )
+
+@dataclass(frozen=True, slots=True)
+class UserDetailsSnapshot:
+    id: UUID
+    name: str
+    age: int
+    gender: Optional[str]
+    location_long: Optional[str]
+    location_lat: Optional[str]
+    body_measurements: Optional[BodyMeasurementsSnapshot]
+    style_preferences: Optional[StylePreferencesSnapshot]
+
+    @classmethod
+    def from_model(cls, model: Optional[UserDetailsModel]) -> Optional["UserDetailsSnapshot"]:
+        if model is None:
+            return None
+        return cls(
+            id=model.id,
+            name=model.name,
+            age=model.age,
+            gender=model.gender,
+            location_long=model.location_long,
+            location_lat=model.location_lat,
+            body_measurements=BodyMeasurementsSnapshot.from_model(model.body_measurements),
+            style_preferences=StylePreferencesSnapshot.from_model(model.style_preferences)
+        )
+
+@dataclass(frozen=True, slots=True)
+class UserPreferencesSnapshot:
+    id: UUID
+    receive_notifications: bool
+    allow_data_sharing: bool
+
+    @classmethod
+    def from_model(cls, model: Optional[UserPreferencesModel]) -> Optional["UserPreferencesSnapshot"]:
+        if model is None:
+            return None
+        return cls(
+            id=model.id,
+            receive_notifications=model.receive_notifications,
+            allow_data_sharing=model.allow_data_sharing
+        )
+
+@dataclass(frozen=True, slots=True)
+class UserProfileSnapshot:
+    id: UUID
+    email: str
+    username: str
+    is_active: bool
+    created_at: datetime
+    updated_at: Optional[datetime]
+    profile_image_url: Optional[str]
+    # None either when the user has none or when it was not loaded
+    user_details: Optional[UserDetailsSnapshot] = None
+    user_preferences: Optional[UserPreferencesSnapshot] = None
+
+    @classmethod
+    def from_model(
+        cls,
+        model: UserModel,
+        include_details: bool = True,
+        include_preferences: bool = True
+    ) -> "UserProfileSnapshot":
+        return cls(
+            id=model.id,
+            email=model.email,
+            username=model.username,
+            is_active=model.is_active,
+            created_at=model.created_at,
+            updated_at=model.updated_at,
+            profile_image_url=model.profile_image_url,
+            user_details=UserDetailsSnapshot.from_model(model.user_details) if include_details else None,
+            user_preferences=UserPreferencesSnapshot.from_model(model.user_preferences) if include_preferences else None
+        )
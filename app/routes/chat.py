@@ -1,15 +1,16 @@
 # app/routes/chat.py
-from fastapi import APIRouter, Depends, HTTPException
-from typing import List
+from fastapi import APIRouter, Depends, HTTPException, Query
+from typing import Optional
 from uuid import UUID
 
 from app.utils.openai_helper import get_ai_response
 from ..auth.jwt_bearer import JWTBearer
 from ..crud.chat import ChatCRUD
-from ..models.chat import ChatSession, Message
+from ..models.chat import ChatSessionPage, ChatSessionSummary, Message
+from ..models.paginated_response import PaginatedResponse
 from ..schemas.chat import ChatContextOptions
 from ..models.models import UserModel  # Import your UserModel
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from ..database.session import get_db
 
 
@@ -17,12 +18,15 @@ from ..database.session import get_db
 router = APIRouter(prefix="/chat", tags=["chat"])
 jwt_bearer = JWTBearer()
 
+# Page size for GET /{session_id} when only since/before is given
+DEFAULT_MESSAGE_PAGE_SIZE = 50
+
 @router.post("/sessions")
 async def create_chat_session(
     context_options: ChatContextOptions,
     session_name: str = None,
     current_user: UserModel = Depends(jwt_bearer),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ) -> dict:
     """
     Create a new chat session with specified context options.
@@ -42,8 +46,8 @@ async def create_chat_session(
         db, 
         current_user.id,
         context_options,
-        session_name,
-        
+        session_name
+    )
 
     return {"session_id": session_id}
 
@@ -52,20 +56,19 @@ async def send_message(
     session_id: str,
     message: str,
     current_user: UserModel = Depends(jwt_bearer),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ) -> dict:
-    chat_session = await ChatCRUD.get_chat_history(session_id)
+    # Only the recent tail of the conversation is sent to the model
+    chat_session = await ChatCRUD.get_history_window(session_id)
     if not chat_session:
         raise HTTPException(status_code=404, detail="Chat session not found")
     
     if chat_session.user_id != current_user.id:
         raise HTTPException(status_code=403, detail="Not authorized to access this chat")
     
-    # Add user message
+    # Add user message, and to the window we already have instead of re-reading
     await ChatCRUD.add_message(session_id, "user", message)
-    
-    # Re-fetch the updated chat session
-    chat_session = await ChatCRUD.get_chat_history(session_id)
+    chat_session.messages.append(Message(role="user", content=message))
     
     # Get AI response with context
     ai_response = await get_ai_response(chat_session.messages, chat_session.user_context)
@@ -76,25 +79,57 @@ async def send_message(
     return {"response": ai_response}
 
 
-@router.get("/sessions", response_model=List[ChatSession])
+@router.get("/sessions", response_model=PaginatedResponse[ChatSessionSummary])
 async def list_chat_sessions(
+    limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
     current_user: UserModel = Depends(jwt_bearer)
 ):
+    """
+    List the current user's chat sessions, most recently active first.
+
+    Each entry carries the message count and a preview of the last message;
+    fetch `GET /api/chat/{session_id}` for the full conversation.
+    """
     try:
-        sessions = await ChatCRUD.get_user_chat_sessions(current_user.id)
-        return sessions
+        sessions, next_cursor = await ChatCRUD.get_user_chat_session_page(
+            current_user.id, limit=limit, cursor=cursor
+        )
+        return {
+            "items": sessions,
+            "size": len(sessions),
+            "next_cursor": next_cursor
+        }
+    except ValueError as ve:
+        raise HTTPException(status_code=400, detail=str(ve))
     except Exception as e:
         raise HTTPException(
             status_code=500,
             detail=f"Error retrieving chat sessions: {str(e)}"
         )
 
-@router.get("/{session_id}", response_model=ChatSession)
+@router.get("/{session_id}", response_model=ChatSessionPage)
 async def get_chat_history(
     session_id: str,
+    since: Optional[int] = Query(None, ge=0, description="Return the messages after this seq, oldest first"),
+    before: Optional[int] = Query(None, ge=1, description="Return the messages before this seq"),
+    limit: Optional[int] = Query(None, ge=1, le=200, description="Page size"),
     current_user: UserModel = Depends(jwt_bearer)
 ):
-    chat = await ChatCRUD.get_chat_history(session_id)
+    """
+    Get a chat session with its messages.
+
+    Without `since`, `before` or `limit` the whole conversation is returned.
+    Otherwise only one page of messages is: pass the highest `seq` you hold
+    as `since` to fetch what is new, or the lowest as `before` to scroll
+    back. `limit` alone returns the newest messages.
+    """
+    if since is None and before is None and limit is None:
+        chat = await ChatCRUD.get_chat_history(session_id)
+    else:
+        chat = await ChatCRUD.get_message_page(
+            session_id, since=since, before=before, limit=limit or DEFAULT_MESSAGE_PAGE_SIZE
+        )
     if not chat:
         raise HTTPException(status_code=404, detail="Chat session not found")
     if str(chat.user_id) != str(current_user.id):
@@ -1,11 +1,11 @@
 # app/routes/upload.py
 from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Form
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from ..database.session import get_db
 from ..auth.jwt_bearer import JWTBearer
+from ..auth.principal_cache import principal_cache
 from ..utils.s3 import S3Client
 from ..models.models import UserModel
-from ..crud.wardrobe import get_item
 import logging
 
 router = APIRouter(tags=["uploads"])
@@ -15,7 +15,7 @@ logger = logging.getLogger(__name__)
 async def upload_profile_picture(
     file: UploadFile = File(...),
     current_user: UserModel = Depends(JWTBearer()),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """
     Upload a profile picture for the current user.
@@ -49,7 +49,9 @@ async def upload_profile_picture(
         # Update user record
         try:
             current_user.profile_image_url = url
-            db.commit()
+            current_user.profile_version = UserModel.profile_version + 1
+            await db.commit()
+            principal_cache.invalidate(current_user.email)
         except Exception as db_error:
             # If database update fails, try to clean up the uploaded file
             logger.error(f"Failed to update database with new profile picture: {str(db_error)}")
@@ -77,7 +79,7 @@ async def upload_profile_picture(
 @router.delete("/users/me/profile-picture", summary="Delete Profile Picture")
 async def delete_profile_picture(
     current_user: UserModel = Depends(JWTBearer()),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """
     Delete the current user's profile picture.
@@ -92,7 +94,9 @@ async def delete_profile_picture(
                 # Continue to update database even if S3 deletion fails
             
             current_user.profile_image_url = None
-            db.commit()
+            current_user.profile_version = UserModel.profile_version + 1
+            await db.commit()
+            principal_cache.invalidate(current_user.email)
             return {"message": "Profile picture deleted successfully"}
         return {"message": "No profile picture to delete"}
         
@@ -1,55 +1,69 @@
 # app/routes/user.py
-from fastapi import APIRouter, Depends, HTTPException, status, Request
-from sqlalchemy.orm import Session
-from typing import Annotated, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, status, Request
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Annotated, List, Optional
 from fastapi.security import OAuth2PasswordRequestForm
 from ..database.session import get_db
 from jose import JWTError, jwt
 from ..schemas.schemas import (
-    UserCreateSchema, UserSchema, UserUpdateSchema, TokenSchema
+    UserCreateSchema, UserSchema, UserExpandedSchema, UserUpdateSchema, TokenSchema
 )
 from ..crud.user import (
     create_refresh_token,
     create_user,
     get_user_by_email,
     update_user_profile,
-    create_refresh_token,
+    load_user_profile,
     invalidate_refresh_token,
-    get_refresh_token,
-    cleanup_expired_tokens
+    rotate_refresh_token
 )
 from ..auth.jwt_handler import (
     ALGORITHM,
     REFRESH_SECRET_KEY,
-    verify_password,
+    PasswordHasherBusy,
+    verify_password_async,
+    get_password_hash_async,
     create_tokens
 )
 from ..auth.jwt_bearer import JWTBearer
+from ..auth.principal_cache import principal_cache
+from ..utils.etag import profile_etag
+from ..crud.wardrobe import get_wardrobe_summary
+from ..enums.enums import UserExpandEnum
 from ..models.models import UserModel
+from ..models.user_profile import UserProfileSnapshot
 from loguru import logger
 
 router = APIRouter()
 
 # Register user route
 @router.post("/register", response_model=UserSchema)
-def register(user: UserCreateSchema, db: Session = Depends(get_db)):
-    db_user = get_user_by_email(db, email=user.email)
+async def register(user: UserCreateSchema, db: AsyncSession = Depends(get_db)):
+    db_user = await get_user_by_email(db, email=user.email)
     if db_user:
         logger.error(f"Attempt to register with already existing email: {user.email}")
         raise HTTPException(
             status_code=400,
             detail="Email already registered"
         )
+    try:
+        hashed_password = await get_password_hash_async(user.password)
+    except PasswordHasherBusy:
+        raise _password_pool_busy()
     logger.info(f"User registered with email: {user.email}")
-    return create_user(db=db, user=user)
+    return await create_user(db=db, user=user, hashed_password=hashed_password)
 
 # Login route
 @router.post("/login", response_model=TokenSchema)
 async def login(
     form_data: OAuth2PasswordRequestForm = Depends(),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
-    user = authenticate_user(db, form_data.username, form_data.password)
+    try:
+        user = await authenticate_user(db, form_data.username, form_data.password)
+    except PasswordHasherBusy:
+        logger.warning(f"Login rejected, password hashing pool busy: {form_data.username}")
+        raise _password_pool_busy()
     if not user:
         logger.error(f"Login failed: Invalid credentials for {form_data.username}")
         raise HTTPException(
@@ -59,15 +73,15 @@ async def login(
         )
     
     # Create both access and refresh tokens
-    access_token, refresh_token = create_tokens(user.email)
+    tokens = create_tokens(user.email)
     
     # Store refresh token in database
-    create_refresh_token(db, user.id, refresh_token)
+    await create_refresh_token(db, user.id, tokens.refresh_token_id, tokens.refresh_expires_at)
     
     logger.info(f"User logged in: {user.email}")
     return {
-        "access_token": access_token,
-        "refresh_token": refresh_token,
+        "access_token": tokens.access_token,
+        "refresh_token": tokens.refresh_token,
         "token_type": "bearer"
     }
 
@@ -75,7 +89,7 @@ async def login(
 async def refresh_token(
     request: Request,
     refresh_token: Optional[str] = None,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     # First try to get token from request body
     if not refresh_token:
@@ -112,37 +126,26 @@ async def refresh_token(
                 headers={"WWW-Authenticate": "Bearer"},
             )
         
-        # Rest of your existing validation logic...
-        user = get_user_by_email(db, email)
-        if not user:
-            raise HTTPException(
-                status_code=404,
-                detail="User not found",
-                headers={"WWW-Authenticate": "Bearer"},
-            )
-            
-        stored_token = get_refresh_token(db, jti, user.id)
-        if not stored_token or stored_token.is_revoked:
+        # Create new tokens
+        tokens = create_tokens(email)
+        
+        # Revoke the presented token (and any other active ones) and store the
+        # new one in a single statement. Expired tokens are removed by the
+        # background sweeper in app/tasks/refresh_tokens.py.
+        user_id = await rotate_refresh_token(
+            db, jti, tokens.refresh_token_id, tokens.refresh_expires_at
+        )
+        if user_id is None:
             raise HTTPException(
                 status_code=401,
                 detail="Invalid or revoked refresh token",
                 headers={"WWW-Authenticate": "Bearer"},
             )
         
-        # Create new tokens
-        access_token, new_refresh_token = create_tokens(email)
-        
-        # Invalidate old refresh token and store new one
-        invalidate_refresh_token(db, user.id)
-        create_refresh_token(db, user.id, new_refresh_token)
-        
-        # Cleanup expired tokens
-        cleanup_expired_tokens(db)
-        
         logger.info(f"Successfully refreshed tokens for user {email}")
         return {
-            "access_token": access_token,
-            "refresh_token": new_refresh_token,
+            "access_token": tokens.access_token,
+            "refresh_token": tokens.refresh_token,
             "token_type": "bearer"
         }
         
@@ -158,36 +161,72 @@ async def refresh_token(
 @router.post("/logout")
 async def logout(
     current_user = Depends(JWTBearer()),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
-    invalidate_refresh_token(db, current_user.id)
+    await invalidate_refresh_token(db, current_user.id)
+    principal_cache.invalidate(current_user.email)
     logger.info(f"User {current_user.email} successfully logged out")
     return {"message": "Successfully logged out"}
 
 # Read current user route
-@router.get("/users/me", response_model=UserSchema)
-async def read_users_me(current_user = Depends(JWTBearer())):
+@router.get("/users/me", response_model=UserExpandedSchema, response_model_exclude_unset=True)
+async def read_users_me(
+    expand: List[UserExpandEnum] = Query([]),
+    current_user = Depends(profile_etag),
+    db: AsyncSession = Depends(get_db)
+):
+    # 304s for an unchanged profile are answered by profile_etag
     logger.info(f"User details requested for {current_user.email}")
-    return current_user
+    profile = await load_user_profile(
+        db,
+        current_user.id,
+        include_details=UserExpandEnum.USER_DETAILS in expand,
+        include_preferences=UserExpandEnum.USER_PREFERENCES in expand
+    )
+    return await _expanded_user_response(db, profile, expand)
 
 # Update user profile route
-@router.put("/users/me/profile", response_model=UserSchema)
-def update_my_profile(
+@router.put("/users/me/profile", response_model=UserExpandedSchema, response_model_exclude_unset=True)
+async def update_my_profile(
     user_update: UserUpdateSchema,
+    expand: List[UserExpandEnum] = Query([]),
     current_user: UserModel = Depends(JWTBearer()),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
-    updated_user = update_user_profile(db, current_user.id, user_update)
+    updated_user = await update_user_profile(db, current_user.id, user_update)
     if not updated_user:
         logger.error(f"User {current_user.email} not found for profile update")
         raise HTTPException(status_code=404, detail="User not found")
+    principal_cache.invalidate(current_user.email)
     logger.info(f"User {current_user.email} profile updated")
-    return updated_user
+    return await _expanded_user_response(db, updated_user, expand)
 
-def authenticate_user(db: Session, email: str, password: str):
-    user = get_user_by_email(db, email)
+async def authenticate_user(db: AsyncSession, email: str, password: str):
+    user = await get_user_by_email(db, email)
     if not user:
         return False
-    if not verify_password(password, user.hashed_password):
+    if not await verify_password_async(password, user.hashed_password):
         return False
     return user
+
+async def _expanded_user_response(db: AsyncSession, profile: UserProfileSnapshot, expand: List[UserExpandEnum]) -> dict:
+    """
+    Build the user payload with only the requested expansions set, so the
+    response (serialised with exclude_unset) omits everything else. The
+    expansions must have been included when `profile` was loaded.
+    """
+    response = UserSchema.model_validate(profile).model_dump()
+    if UserExpandEnum.USER_DETAILS in expand:
+        response["user_details"] = profile.user_details
+    if UserExpandEnum.USER_PREFERENCES in expand:
+        response["user_preferences"] = profile.user_preferences
+    if UserExpandEnum.WARDROBE_SUMMARY in expand:
+        response["wardrobe_summary"] = await get_wardrobe_summary(db, profile.id)
+    return response
+
+def _password_pool_busy() -> HTTPException:
+    return HTTPException(
+        status_code=503,
+        detail="Server is busy, please retry shortly",
+        headers={"Retry-After": "1"},
+    )
@@ -1,57 +1,160 @@
 # app/routes/wardrobe.py
-from fastapi import APIRouter, Depends, HTTPException, File, Query, UploadFile
-from sqlalchemy.orm import Session
-from typing import List, Optional
+from fastapi import APIRouter, Depends, HTTPException, File, Query, Request, Response, UploadFile
+from pydantic import TypeAdapter, ValidationError
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional, Tuple, Union
 from uuid import UUID
 import logging
 
-from app.enums.enums import CategoryEnum
+from app.enums.enums import CategoryEnum, ImportFormatEnum, PaginationModeEnum
 
+from ..config import get_settings
 from ..database.session import get_db
-from ..schemas.schemas import ItemCreateSchema, ItemSchema, UserSchema, TagSchema
+from ..schemas.schemas import (
+    ItemCreateSchema, ItemSchema, UserSchema, TagSchema, ImportResultSchema, ImportRowErrorSchema,
+    ItemBatchUpdateSchema, ItemBatchResultSchema, ItemFilterSchema, FacetedItemsResponse,
+    WardrobeSummarySchema, WardrobeChangesSchema
+)
 from ..crud.wardrobe import (
     get_user_items,
+    get_user_item,
     create_item,
+    bulk_create_items,
+    batch_update_items,
     get_user_items_by_category,
+    get_user_items_page,
+    search_user_items,
+    get_filtered_items_page,
+    get_item_facet_counts,
+    get_wardrobe_summary,
+    get_item_changes,
+    estimate_user_items_count,
     update_item,
     delete_item,
     upload_item_image
 )
 from ..auth.jwt_bearer import JWTBearer
+from ..utils.etag import wardrobe_etag
+from ..utils.response_cache import listing_cache
 from ..utils.s3 import S3Client
+from ..utils.wardrobe_import import iter_import_records, format_row_error
 
-from ..models.models import ItemModel
+from ..models.paginated_response import PaginatedResponse
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
+settings = get_settings()
+item_list_adapter = TypeAdapter(List[ItemSchema])
+item_page_model = PaginatedResponse[ItemSchema]
 
 s3_client = S3Client()
 
 
-@router.get("/items", response_model=List[ItemSchema])
-def read_items(
+@router.get("/items", response_model=Union[PaginatedResponse[ItemSchema], List[ItemSchema]])
+async def read_items(
+    request: Request,
+    response: Response,
     category: CategoryEnum = Query(..., description="Category of wardrobe items to fetch"),
     skip: int = 0,
-    limit: int = 100,
-    current_user: UserSchema = Depends(JWTBearer()),
-    db: Session = Depends(get_db)
+    limit: int = Query(100, ge=1, le=100),
+    pagination: PaginationModeEnum = Query(PaginationModeEnum.OFFSET, description="offset (legacy, plain list) or cursor"),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page; implies cursor pagination"),
+    include_total: bool = Query(False, description="Add an estimated total to cursor-paginated responses"),
+    current_user: UserSchema = Depends(wardrobe_etag),
+    db: AsyncSession = Depends(get_db)
 ):
     """
     Get all non-deleted items for the current user filtered by category.
+
+    Cursor pagination returns a `PaginatedResponse` with an opaque `next_cursor`
+    and stays fast on deep pages. Offset pagination returns a plain list and is
+    kept for backwards compatibility only.
+
+    Responses carry an ETag; send it back in `If-None-Match` to get a 304
+    when nothing in the wardrobe changed. Serialised pages are cached per
+    user and category until an item in that category is written.
     
     Args:
         category: Required. The category of items to fetch (TOP, BOTTOM, SHOES, etc.)
-        skip: Number of items to skip (pagination)
+        skip: Number of items to skip (offset pagination only)
         limit: Maximum number of items to return
+        pagination: Pagination mode
+        cursor: Cursor returned by the previous page
+        include_total: Whether to include an estimated total (cursor pagination only)
     """
-    items = get_user_items_by_category(db, current_user.id, category, skip=skip, limit=limit)
-    return items
+    offset_mode = pagination == PaginationModeEnum.OFFSET and cursor is None
+    # wardrobe_etag read the version before anything below, so a page cached
+    # under it can be no older than that version
+    cache_params = {"version": request.state.user_versions["wardrobe_version"], "limit": limit}
+    if offset_mode:
+        cache_params["skip"] = skip
+    else:
+        cache_params.update(cursor=cursor, include_total=include_total)
+
+    payload = await listing_cache.get(current_user.id, category, cache_params)
+    if payload is None:
+        if offset_mode:
+            items = await get_user_items_by_category(db, current_user.id, category, skip=skip, limit=limit)
+            payload = item_list_adapter.dump_json(item_list_adapter.validate_python(items, from_attributes=True))
+        else:
+            try:
+                items, next_cursor = await get_user_items_page(db, current_user.id, category, limit=limit, cursor=cursor)
+            except ValueError as ve:
+                raise HTTPException(status_code=400, detail=str(ve))
+
+            total = None
+            if include_total:
+                total = await estimate_user_items_count(db, current_user.id, category)
+            payload = item_page_model.model_validate({
+                "items": items,
+                "size": len(items),
+                "next_cursor": next_cursor,
+                "total": total
+            }, from_attributes=True).model_dump_json().encode()
+        await listing_cache.set(current_user.id, category, cache_params, payload)
+
+    # Returned as is, so copy over the ETag headers set by wardrobe_etag
+    return Response(content=payload, media_type="application/json", headers=dict(response.headers))
+
+@router.get("/stats", response_model=WardrobeSummarySchema)
+async def read_wardrobe_stats(
+    current_user: UserSchema = Depends(JWTBearer()),
+    db: AsyncSession = Depends(get_db)
+):
+    """Item counts per category, favorite count and total value of the current user's wardrobe"""
+    return await get_wardrobe_summary(db, current_user.id)
+
+@router.get("/cache/stats")
+async def read_listing_cache_stats(current_user: UserSchema = Depends(JWTBearer())):
+    """Hit ratio, size and memory usage of the wardrobe listing cache (process-wide)"""
+    return await listing_cache.stats()
+
+@router.get("/changes", response_model=WardrobeChangesSchema)
+async def read_wardrobe_changes(
+    since: int = Query(0, ge=0, description="`version` from the last completed sync; 0 for everything"),
+    limit: int = Query(500, ge=1, le=1000),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page of this sync"),
+    current_user: UserSchema = Depends(JWTBearer()),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Delta sync: items created or modified since `since`, plus tombstones for
+    items deleted since then.
+
+    Follow `next_cursor` (keeping the same `since`) until it is null, then
+    store the returned `version` for the next sync. If `full_resync` is true,
+    drop the local wardrobe and sync again from `since=0`.
+    """
+    try:
+        return await get_item_changes(db, current_user.id, since, limit=limit, cursor=cursor)
+    except ValueError as ve:
+        raise HTTPException(status_code=400, detail=str(ve))
 
 @router.post("/items", response_model=ItemSchema, status_code=201)
-def create_user_item(
+async def create_user_item(
     item: ItemCreateSchema,
     current_user: UserSchema = Depends(JWTBearer()),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """
     Create a new wardrobe item.
@@ -78,7 +181,7 @@ def create_user_item(
     """
     try:
         logger.info(f"UserSchema {current_user.id} is creating a new item.")
-        db_item = create_item(db, item, current_user.id)
+        db_item = await create_item(db, item, current_user.id)
         logger.info(f"ItemSchema created successfully with ID: {db_item.id}")
         return db_item
     except ValueError as ve:
@@ -88,28 +191,202 @@ def create_user_item(
         logger.exception(f"Unexpected error during item creation: {e}")
         raise HTTPException(status_code=500, detail="Internal server error")
 
+@router.post("/items/import", response_model=ImportResultSchema)
+async def import_user_items(
+    request: Request,
+    format: Optional[ImportFormatEnum] = Query(None, description="csv or ndjson; inferred from Content-Type if omitted"),
+    current_user: UserSchema = Depends(JWTBearer()),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Bulk import wardrobe items from a CSV or NDJSON request body.
+
+    The body is streamed and written in batches of IMPORT_BATCH_SIZE rows, so
+    files of any size are imported in bounded memory. Each row is validated
+    against ItemCreateSchema; invalid rows are skipped and reported by row
+    number (the first IMPORT_MAX_REPORTED_ERRORS of them) without failing
+    the rest of the import.
+
+    CSV files need a header row with ItemCreateSchema field names; `colors`
+    and `tags` cells separate their values with `|`.
+
+    **Example Request:**
+
+    ```bash
+    curl -X POST "https://yourapi.com/api/wardrobe/items/import" \
+      -H "Authorization: Bearer YOUR_JWT_TOKEN" \
+      -H "Content-Type: application/x-ndjson" \
+      --data-binary @items.ndjson
+    ```
+    """
+    import_format = format or _import_format_from_content_type(request.headers.get("content-type", ""))
+    if import_format is None:
+        raise HTTPException(
+            status_code=415,
+            detail="Unsupported import format; send text/csv or application/x-ndjson, or pass ?format="
+        )
+
+    logger.info(f"User {current_user.id} is importing items ({import_format.value})")
+    report = ImportResultSchema()
+    batch: List[Tuple[int, ItemCreateSchema]] = []
+    try:
+        records = iter_import_records(request.stream(), import_format, settings.IMPORT_MAX_LINE_BYTES)
+        async for row_number, record in records:
+            if isinstance(record, Exception):
+                _report_import_error(report, row_number, record)
+                continue
+            try:
+                batch.append((row_number, ItemCreateSchema.model_validate(record)))
+            except ValidationError as e:
+                _report_import_error(report, row_number, e)
+                continue
+
+            if len(batch) >= settings.IMPORT_BATCH_SIZE:
+                await _import_batch(db, batch, current_user.id, report)
+                batch = []
+        await _import_batch(db, batch, current_user.id, report)
+    except ValueError as ve:
+        # Unreadable stream (e.g. an over-long line); earlier batches are kept
+        logger.error(f"Import aborted for user {current_user.id}: {ve}")
+        raise HTTPException(
+            status_code=400,
+            detail=f"{ve}. {report.imported} item(s) were imported before the error."
+        )
+
+    logger.info(f"Imported {report.imported} item(s) for user {current_user.id}, {report.failed} row(s) failed")
+    return report
+
+@router.get("/items/search", response_model=PaginatedResponse[ItemSchema])
+async def search_items(
+    q: str = Query(..., min_length=2, max_length=200, description="Search text; supports quotes, OR and -word"),
+    limit: int = Query(50, ge=1, le=100),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    current_user: UserSchema = Depends(JWTBearer()),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Search the current user's wardrobe by name, brand, description, notes
+    and tags, best matches first. Misspellings are matched fuzzily.
+    """
+    try:
+        items, next_cursor = await search_user_items(db, current_user.id, q, limit=limit, cursor=cursor)
+    except ValueError as ve:
+        raise HTTPException(status_code=400, detail=str(ve))
+    return {
+        "items": items,
+        "size": len(items),
+        "next_cursor": next_cursor
+    }
+
+@router.get("/items/filter", response_model=FacetedItemsResponse)
+async def filter_items(
+    category: List[CategoryEnum] = Query([], description="Any of these categories"),
+    color: List[str] = Query([], description="Items with any of these colors"),
+    brand: List[str] = Query([]),
+    size: List[str] = Query([]),
+    tag: List[str] = Query([], description="Items with any of these tags"),
+    min_price: Optional[float] = Query(None, ge=0),
+    max_price: Optional[float] = Query(None, ge=0),
+    is_favorite: Optional[bool] = None,
+    limit: int = Query(50, ge=1, le=100),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    include_facets: Optional[bool] = Query(None, description="Defaults to true on the first page only"),
+    current_user: UserSchema = Depends(JWTBearer()),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Filter the current user's items on several attributes at once (repeat a
+    parameter to match any of several values) and, optionally, get the
+    number of matching items per category, color, brand and tag.
+    """
+    filters = ItemFilterSchema(
+        categories=category,
+        colors=color,
+        brands=brand,
+        sizes=size,
+        tags=tag,
+        min_price=min_price,
+        max_price=max_price,
+        is_favorite=is_favorite
+    )
+    try:
+        items, next_cursor = await get_filtered_items_page(db, current_user.id, filters, limit=limit, cursor=cursor)
+    except ValueError as ve:
+        raise HTTPException(status_code=400, detail=str(ve))
+
+    if include_facets is None:
+        include_facets = cursor is None
+    facets = await get_item_facet_counts(db, current_user.id, filters) if include_facets else None
+    return {
+        "items": items,
+        "size": len(items),
+        "next_cursor": next_cursor,
+        "facets": facets
+    }
+
+@router.post("/items/batch", response_model=ItemBatchResultSchema)
+async def batch_update_user_items(
+    patch: ItemBatchUpdateSchema,
+    current_user: UserSchema = Depends(JWTBearer()),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Apply the same change to up to 500 items at once: set the category or
+    favorite flag, add or remove tags, or soft-delete them. All changes are
+    applied in one transaction.
+
+    **Example Request:**
+
+    ```bash
+    curl -X POST "https://yourapi.com/api/wardrobe/items/batch" \
+      -H "Authorization: Bearer YOUR_JWT_TOKEN" \
+      -H "Content-Type: application/json" \
+      -d '{
+            "item_ids": ["<item_id>", "<item_id>"],
+            "is_favorite": true,
+            "add_tags": ["Summer"],
+            "remove_tags": ["Winter"]
+          }'
+    ```
+    """
+    if (
+        patch.category is None and patch.is_favorite is None and not patch.delete
+        and not patch.add_tags and not patch.remove_tags
+    ):
+        raise HTTPException(status_code=400, detail="Batch update contains no changes")
+
+    try:
+        logger.info(f"User {current_user.id} is batch updating {len(patch.item_ids)} item(s)")
+        items = await batch_update_items(db, patch, current_user.id)
+    except ValueError as ve:
+        logger.error(f"ValueError during batch item update: {ve}")
+        raise HTTPException(status_code=400, detail=str(ve))
+
+    updated_ids = {item.id for item in items}
+    return {
+        "updated": len(items),
+        "items": items,
+        "not_found": [item_id for item_id in dict.fromkeys(patch.item_ids) if item_id not in updated_ids]
+    }
+
 @router.get("/items/{item_id}", response_model=ItemSchema)
-def read_item(
+async def read_item(
     item_id: UUID,
-    current_user: UserSchema = Depends(JWTBearer()),
-    db: Session = Depends(get_db)
+    current_user: UserSchema = Depends(wardrobe_etag),
+    db: AsyncSession = Depends(get_db)
 ):
-    """Retrieve a specific item by its ID"""
-    item = db.query(ItemModel).filter(
-        ItemModel.id == item_id,
-        ItemModel.user_id == current_user.id,
-        ItemModel.is_deleted == False
-    ).first()
+    """Retrieve a specific item by its ID (conditional on `If-None-Match`)"""
+    item = await get_user_item(db, item_id, current_user.id)
     if not item:
         raise HTTPException(status_code=404, detail="ItemSchema not found")
     return item
 
 @router.put("/items/{item_id}", response_model=ItemSchema)
-def update_user_item(
+async def update_user_item(
     item_id: UUID,
     item: ItemCreateSchema,
     current_user: UserSchema = Depends(JWTBearer()),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """
     Update an existing wardrobe item.
@@ -136,7 +413,7 @@ def update_user_item(
     """
     try:
         logger.info(f"UserSchema {current_user.id} is updating item_id: {item_id}")
-        updated_item = update_item(db, item_id, item, current_user.id)
+        updated_item = await update_item(db, item_id, item, current_user.id)
         if not updated_item:
             logger.error("ItemSchema not found")
             raise HTTPException(status_code=404, detail="ItemSchema not found")
@@ -150,13 +427,13 @@ def update_user_item(
         raise HTTPException(status_code=500, detail="Internal server error")
 
 @router.delete("/items/{item_id}", response_model=ItemSchema)
-def delete_user_item(
+async def delete_user_item(
     item_id: UUID,
     current_user: UserSchema = Depends(JWTBearer()),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Delete a wardrobe item"""
-    deleted_item = delete_item(db, item_id, current_user.id)
+    deleted_item = await delete_item(db, item_id, current_user.id)
     if deleted_item is None:
         raise HTTPException(status_code=404, detail="ItemSchema not found or already deleted")
     return deleted_item
@@ -167,7 +444,7 @@ async def upload_item_image_endpoint(
     item_id: UUID,
     image: UploadFile = File(..., description="Image file for the item"),
     current_user: UserSchema = Depends(JWTBearer()),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """
     Upload an image for a specific wardrobe item.
@@ -195,7 +472,7 @@ async def upload_item_image_endpoint(
     
     try:
         logger.info(f"Updating database with image URL for item_id: {item_id}")
-        updated_item = upload_item_image(db, item_id, image_url, current_user.id)
+        updated_item = await upload_item_image(db, item_id, image_url, current_user.id)
         if not updated_item:
             logger.error(f"Item not found: {item_id}. Deleting uploaded image: {image_url}")
             await s3_client.delete_file(image_url)
@@ -210,3 +487,33 @@ async def upload_item_image_endpoint(
         logger.exception(f"Unexpected error during database update: {e}. Deleting uploaded image: {image_url}")
         await s3_client.delete_file(image_url)
         raise HTTPException(status_code=500, detail="Failed to update item with image.")
+
+
+def _import_format_from_content_type(content_type: str) -> Optional[ImportFormatEnum]:
+    media_type = content_type.split(";")[0].strip().lower()
+    if media_type in ("text/csv", "application/csv"):
+        return ImportFormatEnum.CSV
+    if media_type in ("application/x-ndjson", "application/ndjson", "application/jsonl", "application/x-jsonlines"):
+        return ImportFormatEnum.NDJSON
+    return None
+
+def _report_import_error(report: ImportResultSchema, row_number: int, error: Exception) -> None:
+    report.failed += 1
+    if len(report.errors) < settings.IMPORT_MAX_REPORTED_ERRORS:
+        report.errors.append(ImportRowErrorSchema(row=row_number, error=format_row_error(error)))
+    else:
+        report.errors_truncated = True
+
+async def _import_batch(
+    db: AsyncSession,
+    batch: List[Tuple[int, ItemCreateSchema]],
+    user_id: UUID,
+    report: ImportResultSchema
+) -> None:
+    if not batch:
+        return
+    try:
+        report.imported += await bulk_create_items(db, [item for _, item in batch], user_id)
+    except ValueError as ve:
+        for row_number, _ in batch:
+            _report_import_error(report, row_number, ve)
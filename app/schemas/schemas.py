@@ -1,10 +1,11 @@
 from pydantic import BaseModel, EmailStr, Field
-from typing import List, Optional
+from typing import Dict, List, Optional
 from datetime import datetime
 from enum import Enum
 from uuid import UUID
 # schemas/schemas.py
 from pydantic import BaseModel
+from ..models.paginated_response import PaginatedResponse
 
 class TokenSchema(BaseModel):
     access_token: str
@@ -149,11 +150,74 @@ class ItemSchema(BaseModel):
     size: Optional[str]
     image_url: Optional[str]
     created_at: datetime
+    updated_at: Optional[datetime] = None
+    version: Optional[int] = None
     tags: List[TagSchema] = []
 
     class Config:
         from_attributes = True
 
+# Faceted Filtering Schemas
+class ItemFilterSchema(BaseModel):
+    categories: List[CategoryEnum] = []
+    colors: List[str] = []  # Items with any of these colors
+    brands: List[str] = []
+    sizes: List[str] = []
+    tags: List[str] = []  # Items with any of these tags
+    min_price: Optional[float] = None
+    max_price: Optional[float] = None
+    is_favorite: Optional[bool] = None
+
+class FacetCountsSchema(BaseModel):
+    categories: Dict[str, int] = {}
+    colors: Dict[str, int] = {}
+    brands: Dict[str, int] = {}
+    tags: Dict[str, int] = {}
+
+class FacetedItemsResponse(PaginatedResponse[ItemSchema]):
+    facets: Optional[FacetCountsSchema] = None
+
+# Batch Mutation Schemas
+class ItemBatchUpdateSchema(BaseModel):
+    item_ids: List[UUID] = Field(..., min_length=1, max_length=500)
+    category: Optional[CategoryEnum] = None
+    is_favorite: Optional[bool] = None
+    add_tags: List[str] = Field(default_factory=list, example=["Summer"])
+    remove_tags: List[str] = Field(default_factory=list, example=["Winter"])
+    delete: bool = False
+
+class ItemBatchResultSchema(BaseModel):
+    updated: int
+    items: List[ItemSchema]
+    not_found: List[UUID] = []  # Unknown, already deleted or owned by another user
+
+# Delta Sync Schemas
+class ItemTombstoneSchema(BaseModel):
+    id: UUID
+    version: int
+    deleted_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
+
+class WardrobeChangesSchema(BaseModel):
+    items: List[ItemSchema] = []  # Created or modified since `since`
+    deleted: List[ItemTombstoneSchema] = []
+    version: Optional[int] = None  # Pass as `since` next time; only set on the last page
+    next_cursor: Optional[str] = None  # More changes to fetch with the same `since`
+    full_resync: bool = False  # `since` is too old; drop local data and sync from 0
+
+# Bulk Import Schemas
+class ImportRowErrorSchema(BaseModel):
+    row: int
+    error: str
+
+class ImportResultSchema(BaseModel):
+    imported: int = 0
+    failed: int = 0
+    errors: List[ImportRowErrorSchema] = []
+    errors_truncated: bool = False  # More rows failed than are listed in `errors`
+
 # User Preferences Schemas
 class UserPreferencesBaseSchema(BaseModel):
     receive_notifications: bool
@@ -178,19 +242,28 @@ class UserUpdateSchema(BaseModel):
     # wardrobe_items: Optional[List[ItemCreateSchema]] = None
     user_preferences: Optional[UserPreferencesBaseSchema] = None
 
+class WardrobeSummarySchema(BaseModel):
+    total_items: int = 0
+    favorite_count: int = 0
+    total_value: float = 0.0
+    category_counts: Dict[CategoryEnum, int] = {}
+
 class UserSchema(UserBaseSchema):
     id: UUID
     is_active: bool
     created_at: datetime
     updated_at: Optional[datetime] = None
-    user_details: Optional[UserDetailsSchema] = None
-    wardrobe_items: List[ItemSchema] = []
-    user_preferences: Optional[UserPreferencesSchema] = None
     profile_image_url: Optional[str] = None
 
     class Config:
         from_attributes = True
 
+class UserExpandedSchema(UserSchema):
+    # Only present when requested through `expand`
+    user_details: Optional[UserDetailsSchema] = None
+    user_preferences: Optional[UserPreferencesSchema] = None
+    wardrobe_summary: Optional[WardrobeSummarySchema] = None
+
 # Token Schemas
 class TokenSchema(BaseModel):
     access_token: str
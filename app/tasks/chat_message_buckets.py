@@ -0,0 +1,113 @@
+# app/tasks/chat_message_buckets.py
+"""
+Move chat messages out of the `messages` array of chat_sessions documents
+into chat_message_buckets (see app/crud/chat.py).
+
+    python -m app.tasks.chat_message_buckets [--batch-size 100]
+
+Run once, with chat writes stopped, before starting a version of the app that
+reads buckets. It is safe to re-run: converted sessions no longer have a
+`messages` field, and a session interrupted half way still has its array and
+is converted again from scratch.
+"""
+import argparse
+import asyncio
+
+from loguru import logger
+from pymongo import ReplaceOne, UpdateOne
+
+from ..crud.chat import message_bucket, message_preview
+from ..database.mongodb import MongoDB
+
+
+def _convert_session(session: dict):
+    """Bucket upserts and the session update for one unconverted session"""
+    buckets = {}
+    for seq, message in enumerate(session['messages'], start=1):
+        buckets.setdefault(message_bucket(seq), []).append(dict(message, seq=seq))
+
+    bucket_ops = [
+        ReplaceOne(
+            {"session_id": session['_id'], "bucket": bucket},
+            {
+                "session_id": session['_id'],
+                "user_id": session['user_id'],
+                "bucket": bucket,
+                "count": len(messages),
+                "messages": messages
+            },
+            upsert=True
+        )
+        for bucket, messages in buckets.items()
+    ]
+    count = len(session['messages'])
+    session_op = UpdateOne(
+        {"_id": session['_id']},
+        {
+            "$unset": {"messages": ""},
+            "$set": {
+                "message_count": count,
+                "last_seq": count,
+                "last_message": message_preview(session['messages'][-1]) if count else None
+            }
+        }
+    )
+    return bucket_ops, session_op
+
+
+async def migrate_chat_messages(batch_size: int = 100) -> int:
+    """
+    Convert every session still holding a `messages` array, `batch_size`
+    sessions at a time in _id order, so only one batch of conversations is
+    held in memory.
+
+    A session's buckets are written before its array is removed, so an
+    interruption never loses messages.
+
+    Returns the number of sessions converted.
+    """
+    mongodb = MongoDB.get_db()
+
+    converted = 0
+    last_id = None
+    while True:
+        query = {"messages": {"$exists": True}}
+        if last_id is not None:
+            query["_id"] = {"$gt": last_id}
+        sessions = await mongodb.chat_sessions.find(
+            query,
+            {"user_id": 1, "messages": 1}
+        ).sort("_id", 1).limit(batch_size).to_list(length=None)
+        if not sessions:
+            return converted
+
+        bucket_ops = []
+        session_ops = []
+        for session in sessions:
+            session_bucket_ops, session_op = _convert_session(session)
+            bucket_ops.extend(session_bucket_ops)
+            session_ops.append(session_op)
+
+        if bucket_ops:
+            await mongodb.chat_message_buckets.bulk_write(bucket_ops, ordered=False)
+        await mongodb.chat_sessions.bulk_write(session_ops, ordered=False)
+
+        converted += len(sessions)
+        last_id = sessions[-1]['_id']
+        logger.info(f"Moved messages of {converted} chat sessions into buckets")
+
+
+async def _main(batch_size: int) -> None:
+    await MongoDB.connect_to_mongo()
+    try:
+        converted = await migrate_chat_messages(batch_size=batch_size)
+        logger.info(f"Chat message bucketing finished: {converted} sessions")
+    finally:
+        await MongoDB.close_mongo_connection()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Move chat messages into chat_message_buckets")
+    parser.add_argument("--batch-size", type=int, default=100, help="Sessions per batch")
+    args = parser.parse_args()
+    asyncio.run(_main(args.batch_size))
@@ -0,0 +1,38 @@
+# app/tasks/item_archive.py
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+from loguru import logger
+
+from ..config import get_settings
+from ..crud.wardrobe import archive_deleted_items
+from ..database.base import AsyncSessionLocal
+
+settings = get_settings()
+
+
+async def archive_deleted_items_periodically(
+    retention_days: int = settings.ITEM_ARCHIVE_RETENTION_DAYS,
+    interval_seconds: int = settings.ITEM_ARCHIVE_INTERVAL_SECONDS,
+    batch_size: int = settings.ITEM_ARCHIVE_BATCH_SIZE
+):
+    """
+    Periodically move items soft-deleted more than `retention_days` ago out
+    of the hot items table into items_archive.
+
+    Runs for the lifetime of the app; started and cancelled from the startup
+    and shutdown hooks in app/main.py.
+    """
+    while True:
+        try:
+            deleted_before = datetime.now(timezone.utc) - timedelta(days=retention_days)
+            async with AsyncSessionLocal() as db:
+                archived = await archive_deleted_items(db, deleted_before, batch_size=batch_size)
+            if archived:
+                logger.info(f"Archived {archived} soft-deleted items")
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"Soft-deleted item archival failed: {str(e)}")
+
+        await asyncio.sleep(interval_seconds)
@@ -0,0 +1,34 @@
+# app/tasks/refresh_tokens.py
+import asyncio
+
+from loguru import logger
+
+from ..config import get_settings
+from ..crud.user import cleanup_expired_tokens
+from ..database.base import AsyncSessionLocal
+
+settings = get_settings()
+
+
+async def sweep_expired_refresh_tokens(
+    interval_seconds: int = settings.REFRESH_TOKEN_SWEEP_INTERVAL_SECONDS,
+    batch_size: int = settings.REFRESH_TOKEN_SWEEP_BATCH_SIZE
+):
+    """
+    Periodically delete expired refresh tokens in batches.
+
+    Runs for the lifetime of the app; started and cancelled from the startup
+    and shutdown hooks in app/main.py.
+    """
+    while True:
+        try:
+            async with AsyncSessionLocal() as db:
+                deleted = await cleanup_expired_tokens(db, batch_size=batch_size)
+            if deleted:
+                logger.info(f"Removed {deleted} expired refresh tokens")
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"Expired refresh token sweep failed: {str(e)}")
+
+        await asyncio.sleep(interval_seconds)
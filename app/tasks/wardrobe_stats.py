@@ -0,0 +1,77 @@
+# app/tasks/wardrobe_stats.py
+"""
+Recompute the wardrobe_stats table from the items table.
+
+    python -m app.tasks.wardrobe_stats [--batch-size 500]
+
+Normally the table is maintained incrementally by the item writes in
+app/crud/wardrobe.py; run this after a manual data fix or if it drifts.
+"""
+import argparse
+import asyncio
+
+from loguru import logger
+from sqlalchemy import delete, func, insert, select, text
+
+from ..database.base import AsyncSessionLocal, async_engine
+from ..models.models import ItemModel, UserModel, WardrobeStatsModel
+
+
+async def rebuild_wardrobe_stats(batch_size: int = 500) -> int:
+    """
+    Rebuild the stats of every user, `batch_size` users per transaction.
+
+    Each batch locks wardrobe_stats against writes (SHARE ROW EXCLUSIVE) while
+    it recomputes: item writes already holding stats rows are waited for, and
+    new ones wait for the batch to commit, so no delta is lost or counted
+    twice. Reads are not blocked.
+
+    Returns the number of users processed.
+    """
+    processed = 0
+    last_user_id = None
+    while True:
+        async with AsyncSessionLocal() as db:
+            query = select(UserModel.id).order_by(UserModel.id).limit(batch_size)
+            if last_user_id is not None:
+                query = query.where(UserModel.id > last_user_id)
+            user_ids = (await db.execute(query)).scalars().all()
+            if not user_ids:
+                return processed
+
+            await db.execute(text("LOCK TABLE wardrobe_stats IN SHARE ROW EXCLUSIVE MODE"))
+            await db.execute(delete(WardrobeStatsModel).where(WardrobeStatsModel.user_id.in_(user_ids)))
+            await db.execute(
+                insert(WardrobeStatsModel).from_select(
+                    ["user_id", "category", "item_count", "favorite_count", "total_value"],
+                    select(
+                        ItemModel.user_id,
+                        ItemModel.category,
+                        func.count(),
+                        func.count().filter(ItemModel.is_favorite == True),
+                        func.coalesce(func.sum(ItemModel.price), 0.0)
+                    )
+                    .where(ItemModel.user_id.in_(user_ids), ItemModel.is_deleted == False)
+                    .group_by(ItemModel.user_id, ItemModel.category)
+                )
+            )
+            await db.commit()
+
+        processed += len(user_ids)
+        last_user_id = user_ids[-1]
+        logger.info(f"Rebuilt wardrobe stats for {processed} users")
+
+
+async def _main(batch_size: int) -> None:
+    try:
+        processed = await rebuild_wardrobe_stats(batch_size=batch_size)
+        logger.info(f"Wardrobe stats rebuild finished: {processed} users")
+    finally:
+        await async_engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Recompute wardrobe_stats from items")
+    parser.add_argument("--batch-size", type=int, default=500, help="Users per transaction")
+    args = parser.parse_args()
+    asyncio.run(_main(args.batch_size))
@@ -0,0 +1,88 @@
+# app/utils/etag.py
+import hashlib
+from typing import Optional
+
+from fastapi import Depends, HTTPException, Request, Response, status
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..auth.jwt_bearer import JWTBearer
+from ..database.session import get_db
+from ..models.models import UserModel
+
+# Conditional responses must be revalidated, and only by the user they belong to
+CACHE_CONTROL = "private, no-cache"
+
+
+def make_etag(*parts) -> str:
+    """Strong ETag (quoted) over the string forms of `parts`"""
+    digest = hashlib.sha256("\x1f".join(str(part) for part in parts).encode()).hexdigest()
+    return f'"{digest[:32]}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """
+    Whether an If-None-Match header matches `etag`. Comparison is weak, as
+    RFC 9110 requires for If-None-Match, so a W/ prefix is ignored.
+    """
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    return any(
+        candidate.strip().removeprefix("W/") == etag
+        for candidate in if_none_match.split(",")
+    )
+
+
+class UserVersionETag:
+    """
+    Dependency for conditional GETs on per-user data, resolving to the
+    authenticated user in place of JWTBearer.
+
+    The ETag hashes the request URL, the user id and the user's current
+    values of `version_columns` (counters on users that the relevant writes
+    bump), so it changes whenever that data may have. When If-None-Match
+    matches, a bodyless 304 is raised before the route body runs, skipping
+    its queries and serialisation; otherwise the ETag is added to the
+    response. Either way this costs a single primary-key read. The versions
+    read are left in `request.state.user_versions` (column name -> value),
+    for keying anything else derived from the same data.
+
+        wardrobe_etag = UserVersionETag(UserModel.wardrobe_version)
+
+        @router.get("/items")
+        async def read_items(current_user: UserModel = Depends(wardrobe_etag), ...):
+    """
+
+    _bearer = JWTBearer()
+
+    def __init__(self, *version_columns):
+        self.version_columns = version_columns
+
+    async def __call__(
+        self,
+        request: Request,
+        response: Response,
+        current_user: UserModel = Depends(_bearer),
+        db: AsyncSession = Depends(get_db)
+    ) -> UserModel:
+        # Users in the principal cache may carry stale versions, so always
+        # read them from the row
+        result = await db.execute(
+            select(*self.version_columns).where(UserModel.id == current_user.id)
+        )
+        versions = result.one()
+        request.state.user_versions = dict(zip((column.key for column in self.version_columns), versions))
+        etag = make_etag(request.url.path, request.url.query, current_user.id, *versions)
+        headers = {"ETag": etag, "Cache-Control": CACHE_CONTROL}
+
+        if etag_matches(request.headers.get("if-none-match"), etag):
+            raise HTTPException(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+        response.headers.update(headers)
+        return current_user
+
+
+wardrobe_etag = UserVersionETag(UserModel.wardrobe_version)
+# The profile response can embed the wardrobe summary, so it follows both
+profile_etag = UserVersionETag(UserModel.profile_version, UserModel.wardrobe_version)
@@ -1,12 +1,21 @@
 # mixins.py
 
-from sqlalchemy import Column, Boolean
+from datetime import datetime, timezone
+
+from sqlalchemy import Column, Boolean, DateTime
 
 class SoftDeleteMixin:
+    """
+    Rows are flagged instead of deleted. SELECTs skip them automatically (see
+    app/utils/queries.py) unless run with `include_deleted=True`.
+    """
     is_deleted = Column(Boolean, default=False, nullable=False)
+    deleted_at = Column(DateTime(timezone=True), nullable=True)
 
     def soft_delete(self):
         self.is_deleted = True
+        self.deleted_at = datetime.now(timezone.utc)
 
     def restore(self):
         self.is_deleted = False
+        self.deleted_at = None
@@ -78,12 +78,11 @@ class OpenAIHelper:
 
         return messages
     
+    def count_tokens(self, text: str) -> int:
+        return len(tiktoken.encoding_for_model(self.model).encode(text))
+
     def _count_tokens(self, messages: List[Dict]) -> int:
-        encoding = tiktoken.encoding_for_model(self.model)
-        num_tokens = 0
-        for message in messages:
-            num_tokens += len(encoding.encode(message['content']))
-        return num_tokens
+        return sum(self.count_tokens(message['content']) for message in messages)
 
     async def get_completion(
         self, 
@@ -1,25 +1,27 @@
 # queries.py
 
-from sqlalchemy.orm import Query
+from sqlalchemy.orm import ORMExecuteState, with_loader_criteria
 
-class SoftDeleteQuery(Query):
-    def __new__(cls, *args, **kwargs):
-        return super().__new__(cls)
+from .mixin import SoftDeleteMixin
 
-    def __init__(self, entities, *args, **kwargs):
-        super().__init__(entities, *args, **kwargs)
-        self._with_deleted = False
+def filter_soft_deleted(execute_state: ORMExecuteState) -> None:
+    """
+    `do_orm_execute` hook that adds `is_deleted = false` for every
+    SoftDeleteMixin entity in ORM SELECTs, including relationship loads, so
+    no query can forget the filter.
 
-    def with_deleted(self):
-        """Include soft-deleted records in the query results."""
-        self._with_deleted = True
-        return self
-
-    def __iter__(self):
-        if not self._with_deleted:
-            # Apply filter to exclude soft-deleted records
-            for desc in self._entities:
-                mapper = desc.mapper
-                if hasattr(mapper.class_, 'is_deleted'):
-                    self = self.filter(mapper.class_.is_deleted == False)
-        return super().__iter__()
+    Opt out per statement with `.execution_options(include_deleted=True)`,
+    e.g. to return tombstones or a just-deleted item.
+    """
+    if (
+        execute_state.is_select
+        and not execute_state.is_column_load
+        and not execute_state.execution_options.get("include_deleted", False)
+    ):
+        execute_state.statement = execute_state.statement.options(
+            with_loader_criteria(
+                SoftDeleteMixin,
+                lambda cls: cls.is_deleted == False,
+                include_aliases=True
+            )
+        )
@@ -0,0 +1,161 @@
+# app/utils/response_cache.py
+import sys
+from typing import Any, Dict, Iterable, Optional
+from uuid import UUID
+
+from loguru import logger
+
+from ..config import get_settings
+from .cache import TTLCache
+
+settings = get_settings()
+
+
+class MemoryCacheBackend:
+    """
+    In-process LRU backend (the default). Entries are per worker process and
+    lost on restart.
+    """
+
+    def __init__(self, maxsize: int, ttl: int):
+        self._cache = TTLCache(maxsize=maxsize, ttl=ttl)
+
+    async def get(self, scope: str, variant: str) -> Optional[bytes]:
+        return self._cache.get((scope, variant))
+
+    async def set(self, scope: str, variant: str, payload: bytes) -> None:
+        self._cache.set((scope, variant), payload)
+
+    async def delete(self, scopes: Iterable[str]) -> None:
+        scopes = set(scopes)
+        self._cache.discard_where(lambda key: key[0] in scopes)
+
+    async def stats(self) -> Dict[str, Any]:
+        stats = self._cache.stats()
+        stats["memory_bytes"] = sum(sys.getsizeof(payload) for payload in self._cache.values())
+        return stats
+
+
+class RedisCacheBackend:
+    """
+    Backend for a Redis-compatible server, shared by every worker. Each scope
+    is one hash of variant -> payload, so invalidating a scope is a single
+    DEL. The whole hash expires `ttl` seconds after its last write.
+
+    Needs the optional `redis` package.
+    """
+
+    def __init__(self, url: str, ttl: int, prefix: str = "wardrobe:listing:"):
+        import redis.asyncio as redis
+
+        self._client = redis.from_url(url)
+        self.ttl = ttl
+        self.prefix = prefix
+
+    async def get(self, scope: str, variant: str) -> Optional[bytes]:
+        return await self._client.hget(self.prefix + scope, variant)
+
+    async def set(self, scope: str, variant: str, payload: bytes) -> None:
+        key = self.prefix + scope
+        async with self._client.pipeline(transaction=True) as pipe:
+            pipe.hset(key, variant, payload)
+            pipe.expire(key, self.ttl)
+            await pipe.execute()
+
+    async def delete(self, scopes: Iterable[str]) -> None:
+        await self._client.delete(*(self.prefix + scope for scope in scopes))
+
+    async def stats(self) -> Dict[str, Any]:
+        info = await self._client.info("memory")
+        return {"memory_bytes": info.get("used_memory")}
+
+
+class ListingCache:
+    """
+    Read-through cache of serialised wardrobe listing responses.
+
+    Entries are grouped into one scope per (user, category) and keyed within
+    it by the remaining request parameters (filters, cursor, limit...), which
+    must include the user's wardrobe_version as read before the page was
+    queried. A page is then only served for the exact version it was built
+    from, whichever worker built it and however it raced with writes. The
+    wardrobe write functions in app/crud/wardrobe.py also drop the scopes
+    whose categories they touched, after committing, so superseded pages do
+    not wait for the TTL or LRU to free them.
+
+    The cache is best effort: backend errors are logged and treated as misses.
+    """
+
+    def __init__(self, backend):
+        self.backend = backend
+        self.hits = 0
+        self.misses = 0
+        self.errors = 0
+
+    @staticmethod
+    def _scope(user_id: UUID, category) -> str:
+        return f"{user_id}:{getattr(category, 'value', category)}"
+
+    @staticmethod
+    def _variant(params: Dict[str, Any]) -> str:
+        return "&".join(f"{key}={getattr(value, 'value', value)}" for key, value in sorted(params.items()))
+
+    async def get(self, user_id: UUID, category, params: Dict[str, Any]) -> Optional[bytes]:
+        try:
+            payload = await self.backend.get(self._scope(user_id, category), self._variant(params))
+        except Exception as e:
+            self.errors += 1
+            logger.warning(f"Listing cache read failed: {str(e)}")
+            payload = None
+
+        if payload is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return payload
+
+    async def set(self, user_id: UUID, category, params: Dict[str, Any], payload: bytes) -> None:
+        try:
+            await self.backend.set(self._scope(user_id, category), self._variant(params), payload)
+        except Exception as e:
+            self.errors += 1
+            logger.warning(f"Listing cache write failed: {str(e)}")
+
+    async def invalidate(self, user_id: UUID, categories: Iterable) -> None:
+        """Drop the user's cached listings for each of `categories`"""
+        scopes = {self._scope(user_id, category) for category in categories if category is not None}
+        if not scopes:
+            return
+        try:
+            await self.backend.delete(scopes)
+        except Exception as e:
+            self.errors += 1
+            logger.error(f"Listing cache invalidation failed for user {user_id}: {str(e)}")
+
+    async def stats(self) -> Dict[str, Any]:
+        """Hit ratio as seen by this process, plus the backend's size and memory usage"""
+        lookups = self.hits + self.misses
+        stats = {
+            "hits": self.hits,
+            "misses": self.misses,
+            "errors": self.errors,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+        try:
+            backend_stats = await self.backend.stats()
+        except Exception as e:
+            logger.warning(f"Listing cache stats unavailable: {str(e)}")
+            backend_stats = {}
+        # The backend's own counters see raw lookups; keep ours
+        for key, value in backend_stats.items():
+            stats.setdefault(key, value)
+        return stats
+
+
+def _create_backend():
+    if settings.LISTING_CACHE_REDIS_URL:
+        return RedisCacheBackend(settings.LISTING_CACHE_REDIS_URL, ttl=settings.LISTING_CACHE_TTL_SECONDS)
+    return MemoryCacheBackend(maxsize=settings.LISTING_CACHE_MAXSIZE, ttl=settings.LISTING_CACHE_TTL_SECONDS)
+
+
+listing_cache = ListingCache(_create_backend())
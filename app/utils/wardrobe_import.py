@@ -0,0 +1,116 @@
+# app/utils/wardrobe_import.py
+import codecs
+import csv
+import json
+from typing import Any, AsyncIterator, Dict, Tuple
+
+from pydantic import ValidationError
+
+from app.enums.enums import ImportFormatEnum
+
+# CSV cells holding lists (colors, tags) separate their values with this
+CSV_LIST_SEPARATOR = "|"
+CSV_LIST_FIELDS = ("colors", "tags")
+
+
+async def iter_lines(chunks: AsyncIterator[bytes], max_line_bytes: int) -> AsyncIterator[str]:
+    """
+    Decode a byte stream as UTF-8 and yield it line by line (newline kept),
+    holding at most one partial line in memory.
+
+    Raises:
+        ValueError: If a line is longer than `max_line_bytes`
+    """
+    decoder = codecs.getincrementaldecoder("utf-8-sig")(errors="replace")
+    buffer = ""
+    async for chunk in chunks:
+        buffer += decoder.decode(chunk)
+        # Only split on \n: str.splitlines() would also break on characters
+        # such as U+2028 that are valid inside JSON strings
+        *lines, buffer = buffer.split("\n")
+        for line in lines:
+            yield line + "\n"
+        if len(buffer.encode()) > max_line_bytes:
+            raise ValueError(f"Line longer than {max_line_bytes} bytes")
+    buffer += decoder.decode(b"", final=True)
+    if buffer:
+        yield buffer
+
+
+async def _iter_csv_records(lines: AsyncIterator[str], max_record_bytes: int) -> AsyncIterator[Tuple[int, Dict[str, Any]]]:
+    header = None
+    record = ""
+    row_number = 0
+    async for line in lines:
+        record += line
+        # A quoted cell may span lines; wait until its quotes are balanced
+        if record.count('"') % 2:
+            if len(record.encode()) > max_record_bytes:
+                raise ValueError(f"Record longer than {max_record_bytes} bytes (unterminated quote?)")
+            continue
+        values, record = next(csv.reader([record])), ""
+        if not values or not any(value.strip() for value in values):
+            continue
+        if header is None:
+            header = [value.strip() for value in values]
+            continue
+
+        row_number += 1
+        row = {}
+        for key, value in zip(header, values):
+            value = value.strip()
+            if value == "":
+                continue
+            if key in CSV_LIST_FIELDS:
+                value = [part.strip() for part in value.split(CSV_LIST_SEPARATOR) if part.strip()]
+            row[key] = value
+        yield row_number, row
+    if record.strip():
+        row_number += 1
+        yield row_number, ValueError("Unterminated quoted field")
+
+
+async def _iter_ndjson_records(lines: AsyncIterator[str]) -> AsyncIterator[Tuple[int, Any]]:
+    row_number = 0
+    async for line in lines:
+        if not line.strip():
+            continue
+        row_number += 1
+        try:
+            yield row_number, json.loads(line)
+        except ValueError:
+            yield row_number, ValueError("Invalid JSON")
+
+
+async def iter_import_records(
+    chunks: AsyncIterator[bytes],
+    import_format: ImportFormatEnum,
+    max_line_bytes: int
+) -> AsyncIterator[Tuple[int, Any]]:
+    """
+    Stream `(row_number, record)` pairs out of an uploaded CSV or NDJSON body.
+
+    Rows are numbered from 1, excluding the CSV header and blank lines. A row
+    that cannot be parsed yields an exception instead of a record, so the
+    caller can report it and carry on.
+
+    CSV files need a header row naming ItemCreateSchema fields; list fields
+    (colors, tags) separate their values with `|`.
+    """
+    lines = iter_lines(chunks, max_line_bytes)
+    if import_format == ImportFormatEnum.CSV:
+        records = _iter_csv_records(lines, max_line_bytes)
+    else:
+        records = _iter_ndjson_records(lines)
+    async for row_number, record in records:
+        yield row_number, record
+
+
+def format_row_error(error: Exception) -> str:
+    """One-line description of why a row was rejected"""
+    if isinstance(error, ValidationError):
+        return "; ".join(
+            f"{'.'.join(str(part) for part in detail['loc']) or 'row'}: {detail['msg']}"
+            for detail in error.errors()
+        )
+    return str(error)
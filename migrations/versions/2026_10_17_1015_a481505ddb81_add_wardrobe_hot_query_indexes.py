@@ -0,0 +1,59 @@
+"""add_wardrobe_hot_query_indexes
+
+Revision ID: a481505ddb81
+Revises: 18f9c53f3dbc
+Create Date: 2026-10-17 10:15:48.226304
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a481505ddb81'
+down_revision: Union[str, None] = '18f9c53f3dbc'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# CREATE INDEX CONCURRENTLY cannot run inside a transaction, so every statement
+# runs in an autocommit block and the tables stay writable during the build.
+# If a concurrent build fails it leaves an INVALID index behind; drop it and
+# re-run the migration.
+
+def upgrade() -> None:
+    with op.get_context().autocommit_block():
+        # get_user_items_by_category: user_id + category, not deleted, newest first
+        op.create_index(
+            'ix_items_user_category_created_active',
+            'items',
+            ['user_id', 'category', 'created_at'],
+            postgresql_where=sa.text('is_deleted = false'),
+            postgresql_concurrently=True
+        )
+
+        # Items by tag; the (item_id, tag_id) primary key can't serve this
+        op.create_index(
+            'ix_item_tags_tag_id_item_id',
+            'item_tags',
+            ['tag_id', 'item_id'],
+            postgresql_concurrently=True
+        )
+
+        # Array overlap/containment on colors
+        op.create_index(
+            'ix_items_colors_gin',
+            'items',
+            ['colors'],
+            postgresql_using='gin',
+            postgresql_concurrently=True
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_items_colors_gin', table_name='items', postgresql_concurrently=True)
+        op.drop_index('ix_item_tags_tag_id_item_id', table_name='item_tags', postgresql_concurrently=True)
+        op.drop_index('ix_items_user_category_created_active', table_name='items', postgresql_concurrently=True)
@@ -0,0 +1,81 @@
+"""add_wardrobe_search
+
+Revision ID: 41685248b4d3
+Revises: a481505ddb81
+Create Date: 2026-10-17 11:30:27.518340
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '41685248b4d3'
+down_revision: Union[str, None] = 'a481505ddb81'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# Must match ITEM_SEARCH_VECTOR_SQL in app/models/models.py
+SEARCH_VECTOR_SQL = (
+    "setweight(to_tsvector('english'::regconfig, coalesce(name, '')), 'A') || "
+    "setweight(to_tsvector('english'::regconfig, coalesce(brand, '')), 'B') || "
+    "setweight(to_tsvector('english'::regconfig, coalesce(description, '')), 'C') || "
+    "setweight(to_tsvector('english'::regconfig, coalesce(notes, '')), 'D')"
+)
+
+
+def upgrade() -> None:
+    op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+
+    # Adding a stored generated column rewrites items under an exclusive lock;
+    # run this in a quiet window on large tables
+    op.add_column(
+        'items',
+        sa.Column(
+            'search_vector',
+            postgresql.TSVECTOR(),
+            sa.Computed(SEARCH_VECTOR_SQL, persisted=True),
+            nullable=True
+        )
+    )
+
+    # The indexes are built concurrently (outside the transaction) so the
+    # tables stay writable; a failed build leaves an INVALID index to drop
+    # before re-running
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_items_search_vector',
+            'items',
+            ['search_vector'],
+            postgresql_using='gin',
+            postgresql_concurrently=True
+        )
+        op.create_index(
+            'ix_items_name_trgm',
+            'items',
+            ['name'],
+            postgresql_using='gin',
+            postgresql_ops={'name': 'gin_trgm_ops'},
+            postgresql_concurrently=True
+        )
+        op.create_index(
+            'ix_tags_name_trgm',
+            'tags',
+            ['name'],
+            postgresql_using='gin',
+            postgresql_ops={'name': 'gin_trgm_ops'},
+            postgresql_concurrently=True
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_tags_name_trgm', table_name='tags', postgresql_concurrently=True)
+        op.drop_index('ix_items_name_trgm', table_name='items', postgresql_concurrently=True)
+        op.drop_index('ix_items_search_vector', table_name='items', postgresql_concurrently=True)
+    op.drop_column('items', 'search_vector')
+    # pg_trgm is left installed; other objects may depend on it
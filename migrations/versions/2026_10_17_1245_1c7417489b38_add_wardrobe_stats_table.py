@@ -0,0 +1,54 @@
+"""add_wardrobe_stats_table
+
+Revision ID: 1c7417489b38
+Revises: 41685248b4d3
+Create Date: 2026-10-17 12:45:03.962118
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '1c7417489b38'
+down_revision: Union[str, None] = '41685248b4d3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'wardrobe_stats',
+        sa.Column('user_id', sa.UUID(), nullable=False),
+        sa.Column(
+            'category',
+            postgresql.ENUM('TOP', 'BOTTOM', 'SHOES', 'ACCESSORIES', 'INNERWEAR', 'OTHER', name='categoryenum', create_type=False),
+            nullable=False
+        ),
+        sa.Column('item_count', sa.Integer(), nullable=False),
+        sa.Column('favorite_count', sa.Integer(), nullable=False),
+        sa.Column('total_value', sa.Float(), nullable=False),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('user_id', 'category')
+    )
+
+    # Backfill from the existing items; `python -m app.tasks.wardrobe_stats`
+    # does the same in per-user batches if the table ever drifts
+    op.execute("""
+        INSERT INTO wardrobe_stats (user_id, category, item_count, favorite_count, total_value)
+        SELECT user_id,
+               category,
+               count(*),
+               count(*) FILTER (WHERE is_favorite),
+               coalesce(sum(price), 0)
+        FROM items
+        WHERE is_deleted = false
+        GROUP BY user_id, category
+    """)
+
+
+def downgrade() -> None:
+    op.drop_table('wardrobe_stats')
@@ -0,0 +1,79 @@
+"""add_item_soft_delete_archive
+
+Revision ID: f620260b6424
+Revises: 1c7417489b38
+Create Date: 2026-10-17 14:00:41.775209
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f620260b6424'
+down_revision: Union[str, None] = '1c7417489b38'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('items', sa.Column('deleted_at', sa.DateTime(timezone=True), nullable=True))
+    # Already-deleted items start their retention window now
+    op.execute("UPDATE items SET deleted_at = now() WHERE is_deleted = true AND deleted_at IS NULL")
+
+    op.create_table(
+        'items_archive',
+        sa.Column('id', sa.UUID(), nullable=False),
+        sa.Column('user_id', sa.UUID(), nullable=False),
+        sa.Column('name', sa.String(), nullable=False),
+        sa.Column('description', sa.String(), nullable=True),
+        sa.Column('colors', postgresql.ARRAY(sa.String()), nullable=False),
+        sa.Column('brand', sa.String(), nullable=True),
+        sa.Column(
+            'category',
+            postgresql.ENUM('TOP', 'BOTTOM', 'SHOES', 'ACCESSORIES', 'INNERWEAR', 'OTHER', name='categoryenum', create_type=False),
+            nullable=False
+        ),
+        sa.Column('is_favorite', sa.Boolean(), nullable=False),
+        sa.Column('price', sa.Float(), nullable=True),
+        sa.Column('notes', sa.String(), nullable=True),
+        sa.Column('size', sa.String(), nullable=True),
+        sa.Column('image_url', sa.String(), nullable=True),
+        sa.Column('is_deleted', sa.Boolean(), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('deleted_at', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('archived_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_items_archive_user_id'), 'items_archive', ['user_id'], unique=False)
+
+    op.create_table(
+        'item_tags_archive',
+        sa.Column('item_id', sa.UUID(), nullable=False),
+        sa.Column('tag_id', sa.UUID(), nullable=False),
+        sa.Column('archived_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.PrimaryKeyConstraint('item_id', 'tag_id')
+    )
+
+    # Lets the archival job find expired soft-deleted items without scanning
+    # the live ones
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_items_deleted_at_deleted',
+            'items',
+            ['deleted_at'],
+            postgresql_where=sa.text('is_deleted = true'),
+            postgresql_concurrently=True
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_items_deleted_at_deleted', table_name='items', postgresql_concurrently=True)
+    op.drop_table('item_tags_archive')
+    op.drop_index(op.f('ix_items_archive_user_id'), table_name='items_archive')
+    op.drop_table('items_archive')
+    op.drop_column('items', 'deleted_at')
@@ -0,0 +1,49 @@
+"""add_wardrobe_change_versions
+
+Revision ID: 8608cb7ee751
+Revises: f620260b6424
+Create Date: 2026-10-17 15:30:19.046551
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8608cb7ee751'
+down_revision: Union[str, None] = 'f620260b6424'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Columns with constant (or now()) defaults are added without rewriting the
+    # tables. Existing items all start at version 1, which every user's
+    # wardrobe_version covers, so a first sync from 0 returns them.
+    op.add_column('users', sa.Column('wardrobe_version', sa.BigInteger(), server_default='1', nullable=False))
+    op.alter_column('users', 'wardrobe_version', server_default='0')
+    op.add_column('users', sa.Column('wardrobe_purged_version', sa.BigInteger(), server_default='0', nullable=False))
+
+    op.add_column('items', sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True))
+    op.add_column('items', sa.Column('version', sa.BigInteger(), server_default='1', nullable=False))
+    # New items always get their version from the write that creates them
+    op.alter_column('items', 'version', server_default=None)
+
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_items_user_version',
+            'items',
+            ['user_id', 'version'],
+            postgresql_concurrently=True
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_items_user_version', table_name='items', postgresql_concurrently=True)
+    op.drop_column('items', 'version')
+    op.drop_column('items', 'updated_at')
+    op.drop_column('users', 'wardrobe_purged_version')
+    op.drop_column('users', 'wardrobe_version')
@@ -0,0 +1,27 @@
+"""add_user_profile_version
+
+Revision ID: 664a86064505
+Revises: 8608cb7ee751
+Create Date: 2026-10-17 16:45:07.512938
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '664a86064505'
+down_revision: Union[str, None] = '8608cb7ee751'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Constant default, so the column is added without rewriting the table
+    op.add_column('users', sa.Column('profile_version', sa.BigInteger(), server_default='0', nullable=False))
+
+
+def downgrade() -> None:
+    op.drop_column('users', 'profile_version')
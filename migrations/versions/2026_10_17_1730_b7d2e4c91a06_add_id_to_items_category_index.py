@@ -0,0 +1,56 @@
+"""add_id_to_items_category_index
+
+Revision ID: b7d2e4c91a06
+Revises: 664a86064505
+Create Date: 2026-10-17 17:30:41.093517
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b7d2e4c91a06'
+down_revision: Union[str, None] = '664a86064505'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# Category pages are ordered and keyset-paginated on (created_at, id); with
+# id as the last column the index yields that order directly, ties included.
+# The new index is built before the old one is dropped, so listings are never
+# left without one. As in a481505ddb81, a failed concurrent build leaves an
+# INVALID index behind; drop it and re-run the migration.
+
+def upgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_items_user_category_created_id_active',
+            'items',
+            ['user_id', 'category', 'created_at', 'id'],
+            postgresql_where=sa.text('is_deleted = false'),
+            postgresql_concurrently=True
+        )
+        op.drop_index(
+            'ix_items_user_category_created_active',
+            table_name='items',
+            postgresql_concurrently=True
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_items_user_category_created_active',
+            'items',
+            ['user_id', 'category', 'created_at'],
+            postgresql_where=sa.text('is_deleted = false'),
+            postgresql_concurrently=True
+        )
+        op.drop_index(
+            'ix_items_user_category_created_id_active',
+            table_name='items',
+            postgresql_concurrently=True
+        )
@@ -0,0 +1,139 @@
+# tests/conftest.py
+import json
+import os
+import uuid
+from typing import List, Optional, Tuple
+
+import pytest
+
+# Module-level clients read these at import time; the tests never call AWS
+os.environ.setdefault("AWS_ACCESS_KEY_ID", "test")
+os.environ.setdefault("AWS_SECRET_ACCESS_KEY", "test")
+os.environ.setdefault("AWS_S3_BUCKET", "test")
+
+from motor.motor_asyncio import AsyncIOMotorClient
+from sqlalchemy import event, text
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.pool import NullPool
+
+from app.config import get_settings
+from app.database.base import Base
+from app.database.mongodb import MongoDB
+from app.models import models, refresh_token  # noqa: F401  (register the tables)
+
+settings = get_settings()
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+@pytest.fixture
+async def engine():
+    """
+    An engine on the configured Postgres database, with the tables created.
+    Tests using it are skipped when the database is unreachable.
+    """
+    # NullPool: every test runs on its own event loop
+    engine = create_async_engine(settings.ASYNC_DATABASE_URL, poolclass=NullPool)
+    try:
+        async with engine.connect() as conn:
+            await conn.execute(text("SELECT 1"))
+    except Exception as e:
+        await engine.dispose()
+        pytest.skip(f"Postgres is not available: {e}")
+
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    yield engine
+    await engine.dispose()
+
+
+@pytest.fixture
+def session_factory(engine):
+    """Sessions configured like AsyncSessionLocal"""
+    return async_sessionmaker(bind=engine, class_=AsyncSession, autoflush=False, expire_on_commit=False)
+
+
+@pytest.fixture
+def executed_statements(engine):
+    """
+    Every (statement, parameters) sent to the database through `engine`
+    while the test runs, in order, exactly as the driver received them.
+    """
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append((statement, parameters))
+
+    event.listen(engine.sync_engine, "before_cursor_execute", record)
+    yield statements
+    event.remove(engine.sync_engine, "before_cursor_execute", record)
+
+
+def _plan_nodes(plan: dict):
+    yield plan["Node Type"], plan.get("Relation Name")
+    for child in plan.get("Plans", []):
+        yield from _plan_nodes(child)
+
+
+@pytest.fixture
+def explain(engine):
+    """
+    Plan a recorded statement (see `executed_statements`) with the planner
+    methods in `disable` turned off (sequential scans by default), returning
+    its (node type, relation) pairs.
+
+    Disabling a method only makes the planner avoid it when something else
+    can do the job, so a Seq Scan left in the plan means no index applies (and
+    a Sort, with "sort" disabled, that no index gives the order), however
+    small the test tables are.
+    """
+    async def explain(statement: str, parameters=(), disable=("seqscan",)) -> List[Tuple[str, Optional[str]]]:
+        async with engine.begin() as conn:
+            for method in disable:
+                await conn.exec_driver_sql(f"SET LOCAL enable_{method} = off")
+            result = await conn.exec_driver_sql(f"EXPLAIN (FORMAT JSON) {statement}", parameters)
+            plan = result.scalar()
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        return list(_plan_nodes(plan[0]["Plan"]))
+    return explain
+
+
+@pytest.fixture
+async def user_id(session_factory):
+    """A fresh user; its wardrobe starts empty"""
+    user = models.UserModel(
+        email=f"{uuid.uuid4().hex}@example.com",
+        username=uuid.uuid4().hex,
+        hashed_password="not-a-hash"
+    )
+    async with session_factory() as db:
+        db.add(user)
+        await db.commit()
+    return user.id
+
+
+@pytest.fixture
+async def mongodb():
+    """
+    MongoDB connected as at app startup, indexes included. Tests using it
+    are skipped when the server is unreachable.
+    """
+    if not settings.MONGODB_URL:
+        pytest.skip("MONGODB_URL is not configured")
+    # Fail fast rather than wait out the driver's 30s server selection
+    probe = AsyncIOMotorClient(settings.MONGODB_URL, serverSelectionTimeoutMS=2000)
+    try:
+        await probe.admin.command("ping")
+    except Exception as e:
+        pytest.skip(f"MongoDB is not available: {e}")
+    finally:
+        probe.close()
+
+    await MongoDB.connect_to_mongo()
+    yield MongoDB.get_db()
+    await MongoDB.close_mongo_connection()
+    MongoDB.client = None
@@ -0,0 +1,41 @@
+# tests/test_chat_buckets.py
+import asyncio
+import uuid
+
+import pytest
+from bson import ObjectId
+
+from app.config import get_settings
+from app.crud.chat import ChatCRUD
+from app.database.mongodb import INDEXES
+from app.schemas.chat import ChatContextOptions
+
+pytestmark = pytest.mark.anyio
+settings = get_settings()
+
+
+def test_bucket_index_is_unique_and_created_at_startup():
+    # MongoDB.connect_to_mongo, run on app startup, creates every index in INDEXES
+    bucket_indexes = {index.document["name"]: index.document for index in INDEXES["chat_message_buckets"]}
+    assert bucket_indexes["session_id_bucket"]["key"] == {"session_id": 1, "bucket": 1}
+    assert bucket_indexes["session_id_bucket"]["unique"] is True
+
+
+async def test_concurrent_appends_share_one_bucket(mongodb):
+    indexes = await mongodb.chat_message_buckets.index_information()
+    assert indexes["session_id_bucket"].get("unique") is True
+
+    session_id = await ChatCRUD.create_chat_session(None, uuid.uuid4(), ChatContextOptions())
+    size = settings.CHAT_MESSAGE_BUCKET_SIZE
+    try:
+        # The session starts with its system message in bucket 0; these fill
+        # it, then race to upsert bucket 1, which the unique index keeps to
+        # one document (the losers' upserts are retried as updates)
+        await asyncio.gather(*(ChatCRUD.add_message(session_id, "user", f"message {n}") for n in range(size + 19)))
+
+        buckets = await mongodb.chat_message_buckets.find(
+            {"session_id": ObjectId(session_id)}
+        ).sort("bucket", 1).to_list(length=None)
+        assert [(bucket["bucket"], bucket["count"]) for bucket in buckets] == [(0, size), (1, 20)]
+    finally:
+        await ChatCRUD.delete_chat_session(session_id)
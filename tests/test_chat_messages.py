@@ -0,0 +1,30 @@
+# tests/test_chat_messages.py
+from datetime import datetime, timedelta
+
+from app.crud.chat import settled_messages
+
+
+def _messages(*seqs, age: timedelta = timedelta(0)):
+    timestamp = datetime.utcnow() - age
+    return [{"seq": seq, "role": "user", "content": f"message {seq}", "timestamp": timestamp} for seq in seqs]
+
+
+def test_contiguous_messages_are_all_settled():
+    messages = _messages(4, 5, 6)
+    assert settled_messages(messages, after=3) == (messages, False)
+    assert settled_messages(messages) == (messages, False)
+
+
+def test_messages_after_an_append_in_flight_are_held_back():
+    messages = _messages(4, 6, 7)
+    assert settled_messages(messages, after=3) == (messages[:1], True)
+    assert settled_messages(messages) == (messages[:1], True)
+
+
+def test_a_missing_first_message_holds_back_the_whole_page():
+    assert settled_messages(_messages(5, 6), after=3) == ([], True)
+
+
+def test_an_abandoned_gap_is_skipped():
+    messages = _messages(4, 6, 7, age=timedelta(minutes=5))
+    assert settled_messages(messages, after=3) == (messages, False)
@@ -0,0 +1,13 @@
+# tests/test_chat_query_plans.py
+import pytest
+
+from app.database.query_plans import QUERY_SHAPES, find_collection_scans
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_chat_queries_use_indexes(mongodb):
+    # The collections exist once their indexes do, so the planner has to
+    # choose between an index and a COLLSCAN even while they are empty
+    assert QUERY_SHAPES
+    assert await find_collection_scans() == []
@@ -0,0 +1,47 @@
+# tests/test_cursors.py
+import uuid
+
+import pytest
+
+from app.crud.wardrobe import get_filtered_items_page, get_item_changes, search_user_items
+from app.schemas.schemas import ItemFilterSchema
+from app.utils.pagination import encode_cursor
+
+pytestmark = pytest.mark.anyio
+
+# Well-formed cursors whose values are not the sort key they claim to be.
+# Each must be rejected before any query runs, hence db=None below.
+BAD_ITEM_CURSORS = [
+    encode_cursor(5, 5),
+    encode_cursor(None, None),
+    encode_cursor(["2026-10-17"], {"id": 1}),
+    encode_cursor("not a date", str(uuid.uuid4())),
+    encode_cursor("2026-10-17T09:30:00", "not a uuid"),
+]
+
+
+@pytest.mark.parametrize("cursor", BAD_ITEM_CURSORS)
+async def test_newest_first_page_rejects_bad_cursor_values(cursor):
+    with pytest.raises(ValueError, match="Invalid cursor"):
+        await get_filtered_items_page(None, uuid.uuid4(), ItemFilterSchema(), cursor=cursor)
+
+
+@pytest.mark.parametrize("cursor", [
+    encode_cursor("3", str(uuid.uuid4())),
+    encode_cursor(3, 3),
+    encode_cursor(3, None),
+    encode_cursor(3, "not a uuid"),
+])
+async def test_item_changes_rejects_bad_cursor_values(cursor):
+    with pytest.raises(ValueError, match="Invalid cursor"):
+        await get_item_changes(None, uuid.uuid4(), since=0, cursor=cursor)
+
+
+@pytest.mark.parametrize("cursor", [
+    encode_cursor("0.5", str(uuid.uuid4())),
+    encode_cursor(0.5, 5),
+    encode_cursor(0.5, "not a uuid"),
+])
+async def test_search_rejects_bad_cursor_values(cursor):
+    with pytest.raises(ValueError, match="Invalid cursor"):
+        await search_user_items(None, uuid.uuid4(), "dress", cursor=cursor)
@@ -0,0 +1,57 @@
+# tests/test_password_hashing.py
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+from fastapi import HTTPException
+
+from app.auth import jwt_handler
+from app.auth.jwt_handler import PasswordHashPool, get_password_hash
+from app.routes import user as user_routes
+
+pytestmark = pytest.mark.anyio
+
+# A real bcrypt hash: each verification takes a few hundred milliseconds
+HASHED_PASSWORD = get_password_hash("correct horse battery staple")
+
+
+async def _max_loop_lag(done: asyncio.Event, interval: float = 0.01) -> float:
+    """Worst delay, beyond `interval`, in waking up a sleeper until `done` is set"""
+    loop = asyncio.get_running_loop()
+    worst = 0.0
+    while not done.is_set():
+        start = loop.time()
+        await asyncio.sleep(interval)
+        worst = max(worst, loop.time() - start - interval)
+    return worst
+
+
+async def test_login_storm_keeps_event_loop_responsive(monkeypatch):
+    pool = PasswordHashPool(max_workers=2, max_pending=4)
+    monkeypatch.setattr(jwt_handler, "password_pool", pool)
+
+    async def get_user_by_email(db, email):
+        return SimpleNamespace(email=email, hashed_password=HASHED_PASSWORD)
+    monkeypatch.setattr(user_routes, "get_user_by_email", get_user_by_email)
+
+    async def attempt_login() -> int:
+        form = SimpleNamespace(username="storm@example.com", password="wrong password")
+        try:
+            await user_routes.login(form_data=form, db=None)
+        except HTTPException as e:
+            return e.status_code
+
+    done = asyncio.Event()
+    lag = asyncio.create_task(_max_loop_lag(done))
+    try:
+        statuses = await asyncio.gather(*(attempt_login() for _ in range(12)))
+        # Admission reopens as soon as the pool drains
+        assert await attempt_login() == 401
+    finally:
+        done.set()
+        pool.shutdown()
+
+    # max_pending logins were hashed and refused; the rest were shed with a 503
+    assert sorted(statuses) == [401] * 4 + [503] * 8
+    # bcrypt ran off the loop: a verification on it would stall it ~0.3s
+    assert await lag < 0.1
@@ -0,0 +1,78 @@
+# tests/test_query_counts.py
+"""
+Loading a page of items must cost a fixed number of queries however many
+items it holds: the items, then their tags in one SELECT ... IN. Each case
+is run for one item and for many, recording every statement sent to the
+database while the result is built and serialised as a response would be.
+"""
+import pytest
+
+from app.crud.chat import ChatCRUD
+from app.crud.wardrobe import (
+    create_item,
+    get_filtered_items_page,
+    get_user_items,
+    get_user_items_by_category,
+    get_user_items_page,
+    search_user_items,
+)
+from app.enums.enums import CategoryEnum
+from app.schemas.chat import ChatContextOptions
+from app.schemas.schemas import ItemCreateSchema, ItemFilterSchema, ItemSchema
+
+pytestmark = pytest.mark.anyio
+
+
+async def _items(db, user_id):
+    return await get_user_items(db, user_id)
+
+
+async def _category(db, user_id):
+    return await get_user_items_by_category(db, user_id, CategoryEnum.TOP)
+
+
+async def _page(db, user_id):
+    items, _ = await get_user_items_page(db, user_id, CategoryEnum.TOP)
+    return items
+
+
+async def _filtered(db, user_id):
+    items, _ = await get_filtered_items_page(db, user_id, ItemFilterSchema(tags=["Summer"]))
+    return items
+
+
+async def _search(db, user_id):
+    items, _ = await search_user_items(db, user_id, "shirt")
+    return items
+
+
+async def _chat_context(db, user_id):
+    await ChatCRUD.get_user_context(db, user_id, ChatContextOptions(include_wardrobe=True))
+    return []
+
+
+async def _query_count(session_factory, executed_statements, user_id, load) -> int:
+    async with session_factory() as db:
+        executed_statements.clear()
+        for item in await load(db, user_id):
+            ItemSchema.model_validate(item)
+        return len(executed_statements)
+
+
+@pytest.mark.parametrize("load", [_items, _category, _page, _filtered, _search, _chat_context])
+async def test_item_loads_do_not_query_per_item(session_factory, user_id, executed_statements, load):
+    async def add_items(count: int):
+        async with session_factory() as db:
+            for n in range(count):
+                await create_item(
+                    db,
+                    ItemCreateSchema(name=f"Linen shirt {n}", category=CategoryEnum.TOP, tags=["Summer", f"Tag {n}"]),
+                    user_id
+                )
+
+    await add_items(1)
+    one = await _query_count(session_factory, executed_statements, user_id, load)
+    await add_items(19)
+    many = await _query_count(session_factory, executed_statements, user_id, load)
+
+    assert many == one <= 2
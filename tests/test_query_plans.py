@@ -0,0 +1,116 @@
+# tests/test_query_plans.py
+"""
+The hot wardrobe and refresh-token queries must be answerable from an index.
+Each test records the SQL a CRUD function actually sends and plans it with
+sequential scans disabled (see the `explain` fixture in conftest.py), so the
+checks do not depend on table sizes or statistics.
+"""
+import uuid
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from app.crud.user import cleanup_expired_tokens, create_refresh_token, get_refresh_token
+from app.crud.wardrobe import (
+    create_item,
+    get_filtered_items_page,
+    get_item_changes,
+    get_user_items_page,
+    search_user_items,
+)
+from app.enums.enums import CategoryEnum
+from app.schemas.schemas import ItemCreateSchema, ItemFilterSchema
+
+pytestmark = pytest.mark.anyio
+
+
+async def _seq_scans(explain, statement, parameters):
+    return [relation for node, relation in await explain(statement, parameters) if node == "Seq Scan"]
+
+
+async def _create_items(session_factory, user_id, count: int = 3):
+    async with session_factory() as db:
+        for n in range(count):
+            await create_item(
+                db,
+                ItemCreateSchema(name=f"Shirt {n}", category=CategoryEnum.TOP, colors=["Blue"], tags=["Summer"]),
+                user_id
+            )
+
+
+async def test_category_page_is_read_in_index_order(session_factory, user_id, executed_statements, explain):
+    await _create_items(session_factory, user_id)
+    async with session_factory() as db:
+        _, cursor = await get_user_items_page(db, user_id, CategoryEnum.TOP, limit=1)
+        executed_statements.clear()
+        await get_user_items_page(db, user_id, CategoryEnum.TOP, limit=1, cursor=cursor)
+
+    # A later page: the keyset condition and the (created_at, id) order are
+    # both served by the partial category index, so nothing is sorted
+    statement, parameters = executed_statements[0]
+    nodes = await explain(statement, parameters, disable=("seqscan", "sort"))
+    assert ("Seq Scan", "items") not in nodes
+    assert "Sort" not in [node for node, _ in nodes]
+
+
+@pytest.mark.parametrize("filters", [
+    ItemFilterSchema(colors=["Blue", "Red"]),  # ix_items_colors_gin
+    ItemFilterSchema(tags=["Summer"]),  # item_tags indexes
+], ids=["colors", "tags"])
+async def test_filtered_page_uses_indexes(session_factory, user_id, executed_statements, explain, filters):
+    await _create_items(session_factory, user_id)
+    async with session_factory() as db:
+        executed_statements.clear()
+        items, _ = await get_filtered_items_page(db, user_id, filters)
+    assert items
+
+    # The filtered items; the selectinload of tags follows
+    statement, parameters = executed_statements[0]
+    seq_scans = await _seq_scans(explain, statement, parameters)
+    assert "items" not in seq_scans
+    assert "item_tags" not in seq_scans
+
+
+async def test_change_feed_uses_indexes(session_factory, user_id, executed_statements, explain):
+    await _create_items(session_factory, user_id)
+    async with session_factory() as db:
+        executed_statements.clear()
+        await get_item_changes(db, user_id, since=1)
+
+    # The users read, then the items; the selectinload of tags follows
+    for statement, parameters in executed_statements[:2]:
+        assert await _seq_scans(explain, statement, parameters) == []
+
+
+async def test_refresh_token_lookup_uses_indexes(session_factory, user_id, executed_statements, explain):
+    token_id = uuid.uuid4().hex
+    async with session_factory() as db:
+        await create_refresh_token(db, user_id, token_id, datetime.now(timezone.utc) + timedelta(days=7))
+        executed_statements.clear()
+        assert await get_refresh_token(db, token_id, user_id) is not None
+
+    statement, parameters = executed_statements[0]
+    assert await _seq_scans(explain, statement, parameters) == []
+
+
+async def test_expired_token_sweep_uses_indexes(session_factory, user_id, executed_statements, explain):
+    async with session_factory() as db:
+        await create_refresh_token(db, user_id, uuid.uuid4().hex, datetime.now(timezone.utc) - timedelta(days=1))
+        executed_statements.clear()
+        await cleanup_expired_tokens(db, batch_size=10)
+
+    delete_statements = [(statement, parameters) for statement, parameters in executed_statements if statement.startswith("DELETE")]
+    assert delete_statements
+    statement, parameters = delete_statements[0]
+    assert await _seq_scans(explain, statement, parameters) == []
+
+
+async def test_search_uses_indexes(session_factory, user_id, executed_statements, explain):
+    async with session_factory() as db:
+        await create_item(db, ItemCreateSchema(name="Summer Dress", category=CategoryEnum.TOP, tags=["Summer"]), user_id)
+        executed_statements.clear()
+        await search_user_items(db, user_id, "summer")
+
+    # The search itself; the selectinload of tags follows it
+    statement, parameters = executed_statements[0]
+    assert await _seq_scans(explain, statement, parameters) == []
@@ -0,0 +1,47 @@
+# tests/test_response_cache.py
+import uuid
+
+import pytest
+
+from app.enums.enums import CategoryEnum
+from app.utils.response_cache import ListingCache, MemoryCacheBackend
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+def cache():
+    return ListingCache(MemoryCacheBackend(maxsize=100, ttl=60))
+
+
+async def test_pages_are_only_served_for_their_wardrobe_version(cache):
+    user_id = uuid.uuid4()
+    await cache.set(user_id, CategoryEnum.TOP, {"version": 1, "limit": 10}, b"[]")
+
+    assert await cache.get(user_id, CategoryEnum.TOP, {"version": 1, "limit": 10}) == b"[]"
+    assert await cache.get(user_id, CategoryEnum.TOP, {"version": 2, "limit": 10}) is None
+
+
+async def test_invalidate_drops_only_the_written_categories(cache):
+    user_id, other_user_id = uuid.uuid4(), uuid.uuid4()
+    params = {"version": 1, "limit": 10}
+    await cache.set(user_id, CategoryEnum.TOP, params, b"tops")
+    await cache.set(user_id, CategoryEnum.SHOES, params, b"shoes")
+    await cache.set(other_user_id, CategoryEnum.TOP, params, b"other")
+
+    await cache.invalidate(user_id, {"TOP": [1, 0, 0.0]})
+
+    assert await cache.get(user_id, CategoryEnum.TOP, params) is None
+    assert await cache.get(user_id, CategoryEnum.SHOES, params) == b"shoes"
+    assert await cache.get(other_user_id, CategoryEnum.TOP, params) == b"other"
+
+
+async def test_stats_report_hit_ratio_and_memory(cache):
+    user_id = uuid.uuid4()
+    await cache.set(user_id, CategoryEnum.TOP, {"version": 1}, b"x" * 100)
+    await cache.get(user_id, CategoryEnum.TOP, {"version": 1})
+    await cache.get(user_id, CategoryEnum.TOP, {"version": 2})
+
+    stats = await cache.stats()
+    assert stats["hit_ratio"] == 0.5
+    assert stats["memory_bytes"] >= 100
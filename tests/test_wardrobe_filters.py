@@ -0,0 +1,29 @@
+# tests/test_wardrobe_filters.py
+import pytest
+
+from app.crud.wardrobe import create_item, delete_item, get_filtered_items_page, get_item_facet_counts
+from app.enums.enums import CategoryEnum
+from app.models.models import UserModel
+from app.schemas.schemas import ItemCreateSchema, ItemFilterSchema
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_tag_filter_only_sees_the_users_live_items(session_factory, user_id):
+    other = UserModel(email=f"other-{user_id}@example.com", username=f"other-{user_id}", hashed_password="not-a-hash")
+    async with session_factory() as db:
+        db.add(other)
+        await db.commit()
+
+        mine = await create_item(db, ItemCreateSchema(name="Linen shirt", category=CategoryEnum.TOP, tags=["Summer"]), user_id)
+        deleted = await create_item(db, ItemCreateSchema(name="Old shirt", category=CategoryEnum.TOP, tags=["Summer"]), user_id)
+        await delete_item(db, deleted.id, user_id)
+        await create_item(db, ItemCreateSchema(name="Sandals", category=CategoryEnum.SHOES, tags=["Summer"]), other.id)
+
+        filters = ItemFilterSchema(tags=["Summer"])
+        items, _ = await get_filtered_items_page(db, user_id, filters)
+        facets = await get_item_facet_counts(db, user_id, filters)
+
+    assert [item.id for item in items] == [mine.id]
+    assert facets["tags"] == {"Summer": 1}
+    assert facets["categories"] == {CategoryEnum.TOP.value: 1}
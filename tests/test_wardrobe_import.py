@@ -0,0 +1,32 @@
+# tests/test_wardrobe_import.py
+import pytest
+
+from app.enums.enums import ImportFormatEnum
+from app.utils.wardrobe_import import iter_import_records, iter_lines
+
+pytestmark = pytest.mark.anyio
+
+
+async def _chunks(*chunks: bytes):
+    for chunk in chunks:
+        yield chunk
+
+
+async def _collect(records):
+    return [record async for record in records]
+
+
+async def test_line_limit_counts_encoded_bytes():
+    # 20 characters, 60 bytes of UTF-8
+    line = "€" * 20
+    with pytest.raises(ValueError, match="longer than 50 bytes"):
+        await _collect(iter_lines(_chunks(line.encode()), max_line_bytes=50))
+    assert await _collect(iter_lines(_chunks(line.encode()), max_line_bytes=60)) == [line]
+
+
+async def test_csv_record_limit_counts_encoded_bytes():
+    # The quoted cell spans three lines; two of them are 29 characters, 69 bytes
+    body = 'name,notes\nShirt,"' + "€" * 10 + "\n" + "€" * 10 + "\n" + '"\n'
+    records = iter_import_records(_chunks(body.encode()), ImportFormatEnum.CSV, max_line_bytes=50)
+    with pytest.raises(ValueError, match="Record longer than 50 bytes"):
+        await _collect(records)
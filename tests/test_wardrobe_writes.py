@@ -0,0 +1,135 @@
+# tests/test_wardrobe_writes.py
+import asyncio
+import uuid
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from sqlalchemy import select
+
+from app.crud.wardrobe import archive_deleted_items, create_item, delete_item, get_item_changes, update_item
+from app.enums.enums import CategoryEnum
+from app.models.models import UserModel, WardrobeStatsModel
+from app.schemas.schemas import ItemCreateSchema
+
+pytestmark = pytest.mark.anyio
+
+
+def _item(**overrides) -> ItemCreateSchema:
+    data = {"name": "Linen shirt", "category": CategoryEnum.TOP, "price": 40.0, "is_favorite": True}
+    data.update(overrides)
+    return ItemCreateSchema(**data)
+
+
+async def _stats(session_factory, user_id) -> dict:
+    """Every wardrobe_stats row of the user, negative ones included"""
+    async with session_factory() as db:
+        result = await db.execute(
+            select(
+                WardrobeStatsModel.category,
+                WardrobeStatsModel.item_count,
+                WardrobeStatsModel.favorite_count,
+                WardrobeStatsModel.total_value
+            ).where(WardrobeStatsModel.user_id == user_id)
+        )
+    return {category: (count, favorites, float(value)) for category, count, favorites, value in result.all()}
+
+
+async def _run_concurrently(session_factory, write, times: int = 2):
+    async def run():
+        async with session_factory() as db:
+            return await write(db)
+    return await asyncio.gather(*(run() for _ in range(times)))
+
+
+async def test_concurrent_deletes_apply_stats_once(session_factory, user_id):
+    async with session_factory() as db:
+        item = await create_item(db, _item(), user_id)
+
+    results = await _run_concurrently(session_factory, lambda db: delete_item(db, item.id, user_id))
+
+    assert sum(result is not None for result in results) == 1
+    assert await _stats(session_factory, user_id) == {CategoryEnum.TOP: (0, 0, 0.0)}
+
+
+async def test_deleting_a_deleted_item_is_a_no_op(session_factory, user_id):
+    async with session_factory() as db:
+        item = await create_item(db, _item(), user_id)
+        assert await delete_item(db, item.id, user_id) is not None
+        assert await delete_item(db, item.id, user_id) is None
+    assert await _stats(session_factory, user_id) == {CategoryEnum.TOP: (0, 0, 0.0)}
+
+
+async def test_concurrent_updates_subtract_old_values_once(session_factory, user_id):
+    async with session_factory() as db:
+        item = await create_item(db, _item(), user_id)
+
+    await _run_concurrently(
+        session_factory,
+        lambda db: update_item(db, item.id, _item(category=CategoryEnum.BOTTOM, is_favorite=False, price=10.0), user_id)
+    )
+
+    assert await _stats(session_factory, user_id) == {
+        CategoryEnum.TOP: (0, 0, 0.0),
+        CategoryEnum.BOTTOM: (1, 0, 10.0),
+    }
+
+
+async def test_concurrent_update_and_delete_commit_in_version_order(session_factory, user_id):
+    async with session_factory() as db:
+        item = await create_item(db, _item(), user_id)
+
+    async def update(db):
+        return await update_item(db, item.id, _item(name="Renamed"), user_id)
+
+    async def delete(db):
+        return await delete_item(db, item.id, user_id)
+
+    await asyncio.gather(
+        _run_concurrently(session_factory, update, times=1),
+        _run_concurrently(session_factory, delete, times=1)
+    )
+
+    # Whichever committed last carries the newest version, and the delete
+    # is never undone or overtaken by a stale update
+    async with session_factory() as db:
+        changes = await get_item_changes(db, user_id, since=0)
+    assert changes["items"] == []
+    assert [tombstone.id for tombstone in changes["deleted"]] == [item.id]
+    assert changes["deleted"][0].version == changes["version"]
+
+
+async def test_concurrent_writes_of_new_tags_do_not_deadlock(session_factory, user_id):
+    for _ in range(10):
+        names = [uuid.uuid4().hex for _ in range(5)]
+
+        async def run(tags):
+            async with session_factory() as db:
+                return await create_item(db, _item(tags=tags), user_id)
+
+        # Opposite orders: unsorted inserts would lock each other's names
+        items = await asyncio.gather(run(names), run(names[::-1]))
+        assert all(sorted(tag.name for tag in item.tags) == sorted(names) for item in items)
+
+
+async def test_archiving_leaves_the_profile_untouched(session_factory, user_id):
+    async with session_factory() as db:
+        item = await create_item(db, _item(), user_id)
+        await delete_item(db, item.id, user_id)
+
+    async def profile_state():
+        async with session_factory() as db:
+            result = await db.execute(
+                select(UserModel.updated_at, UserModel.profile_version, UserModel.wardrobe_purged_version)
+                .where(UserModel.id == user_id)
+            )
+            return result.one()
+
+    updated_at, profile_version, _ = await profile_state()
+    async with session_factory() as db:
+        assert await archive_deleted_items(db, datetime.now(timezone.utc) + timedelta(minutes=1)) >= 1
+
+    # Neither version in profile_etag moves, so neither may the profile body
+    after_updated_at, after_profile_version, purged_version = await profile_state()
+    assert (after_updated_at, after_profile_version) == (updated_at, profile_version)
+    assert purged_version > 0